@@ -2,362 +2,17 @@
 FINAL COMPLETE PIPELINE
 All algorithms on all data (including London!)
 Everything FIXED and WORKING
-"""
-
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
-
-import pandas as pd
-import networkx as nx
-import time
-
-from cpp_adapters import solve_classical_cpp, solve_greedy_heuristic
-from cpp_lc_corrected import solve_cpp_lc_corrected
-from simple_ml_cpp import SimpleMLCPP
-from experimental_pipeline import ExperimentResult
-
-print("="*70)
-print("FINAL COMPLETE PIPELINE")
-print("="*70)
-print("\nIncluded:")
-print("  ✓ 25 benchmark graphs from data/")
-print("  ✓ London real network (150 nodes)")
-print("  ✓ Classical CPP (optimal)")
-print("  ✓ Greedy heuristic")
-print("  ✓ CPP-LC (FIXED - now increases costs!)")
-print("  ✓ ML learning")
-print("\nEstimated time: 10-15 minutes\n")
-
-# Auto-start
-print("Starting automatically...\n")
-
-start_time = time.time()
-
-# Load all graphs
-graphs = {}
-
-# Load GML files
-data_dir = Path("data")
-for gml_file in data_dir.glob("*.gml"):
-    try:
-        G = nx.read_gml(str(gml_file))
-        # Convert to integers for consistency
-        G = nx.convert_node_labels_to_integers(G)
-        graphs[gml_file.stem] = G
-    except:
-        pass
-
-# Load ALL OSM-derived real networks
-osm_dir = Path("benchmarks/osm_derived")
-if osm_dir.exists():
-    for graphml_file in osm_dir.glob("*.graphml"):
-        try:
-            # SKIP northern_zones - too large (1614 odd vertices)
-            if "northern" in graphml_file.stem.lower():
-                print(f"⏭️  Skipping {graphml_file.stem} (too large for matching)")
-                continue
-                
-            G_osm = nx.read_graphml(str(graphml_file))
-            # Convert to integers (OSM has string nodes)
-            G_osm = nx.convert_node_labels_to_integers(G_osm)
-
-            # Use friendly name
-            if "london" in graphml_file.stem:
-                name = "london_real"
-            else:
-                name = graphml_file.stem
-
-            graphs[name] = G_osm
-            print(f"✅ Loaded {name} ({G_osm.number_of_nodes()} nodes)")
-        except Exception as e:
-            print(f"⚠️  Failed to load {graphml_file.name}: {e}")
-
-print(f"\n✅ Loaded {len(graphs)} total graphs\n")
-
-results = []
-classical_costs = {}
-training_data = []
-
-# Helper function to convert edge sequences to node sequences
-def edges_to_node_sequence(edge_list):
-    """Convert Eulerian circuit edge list to node sequence for ML training"""
-    if not edge_list:
-        return []
-    nodes = [edge_list[0][0]]  # Start with first node
-    for u, v in edge_list:
-        nodes.append(v)  # Add each endpoint
-    return nodes
-
-# ==================== CLASSICAL CPP ====================
-print("="*70)
-print("1/4: Classical CPP")
-print("="*70)
-
-for i, (instance_id, G) in enumerate(graphs.items(), 1):
-    try:
-        start = time.time()
-        result = solve_classical_cpp(G, timeout_seconds=600)  # 10 minute timeout
-        runtime = time.time() - start
-        
-        cost = result['cost']
-        tour = result['tour']
-        approximation_mode = result.get('approximation_mode', False)
-        
-        classical_costs[instance_id] = cost
-        
-        # Only add to training data if not in approximation mode
-        # Convert edge sequence to node sequence for ML training
-        if not approximation_mode:
-            node_tour = edges_to_node_sequence(tour) if tour else []
-            training_data.append((G, node_tour))
-        
-        # Determine baseline type
-        baseline_type = 'APPROXIMATION' if approximation_mode else 'OPTIMAL'
-        
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='classical_cpp',
-            variant='classical',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=G.number_of_nodes(),
-            num_edges=G.number_of_edges(),
-            network_family='benchmark',
-            size='various',
-            gap_from_classical=0.0,
-            metadata={
-                'baseline_type': baseline_type,
-                'approximation_mode': approximation_mode,
-                'failure_reason': result.get('failure_reason'),
-                'num_odd_vertices': result.get('num_odd_vertices')
-            }
-        ))
-        
-        # Print status
-        status = "⚠️ APPROX" if approximation_mode else "✓ OPTIMAL"
-        print(f"  [{i}/{len(graphs)}] {instance_id}: {status} cost={cost:.2f}")
-            
-    except Exception as e:
-        print(f"  ✗ {instance_id}: {e}")
-
-
-print(f"  ✅ {len([r for r in results if r.algorithm == 'classical_cpp'])} results\n")
-
-# ==================== GREEDY ====================
-print("="*70)
-print("2/4: Greedy Heuristic")
-print("="*70)
-
-for i, (instance_id, G) in enumerate(graphs.items(), 1):
-    try:
-        start = time.time()
-        cost, tour = solve_greedy_heuristic(G)
-        runtime = time.time() - start
-        
-        gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
-        
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='greedy',
-            variant='greedy',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=G.number_of_nodes(),
-            num_edges=G.number_of_edges(),
-            network_family='benchmark',
-            size='various',
-            gap_from_classical=gap
-        ))
-        
-        if i % 5 == 0:
-            print(f"  Progress: {i}/{len(graphs)}")
-            
-    except:
-        pass
-
-print(f"  ✅ {len([r for r in results if r.algorithm == 'greedy'])} results\n")
-
-# ==================== ML LEARNING (IMPROVED) ====================
-print("="*70)
-print("3/4: ML Learning (Improved - Random Forest)")
-print("="*70)
-
-from improved_ml_cpp import ImprovedMLCPP
 
-ml_solver = ImprovedMLCPP()
-ml_count = 0
-
-try:
-    # Train on ALL graphs (not just one)
-    print(f"  Training on {len(training_data)} graphs...")
-
-    if ml_solver.train_from_solutions(training_data):
-        print("  ✓ Training complete (Random Forest with rich features)")
-
-        for i, (instance_id, G) in enumerate(graphs.items(), 1):
-            try:
-                start = time.time()
-                cost, tour, meta = ml_solver.solve_with_learning(G)
-                runtime = time.time() - start
-
-                gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
-
-                results.append(ExperimentResult(
-                    instance_id=instance_id,
-                    algorithm='ml_improved',
-                    variant='random_forest',
-                    cost=cost,
-                    tour_length=len(tour) if tour else 0,
-                    feasible=True,
-                    runtime_seconds=runtime,
-                    num_nodes=G.number_of_nodes(),
-                    num_edges=G.number_of_edges(),
-                    network_family='benchmark',
-                    size='various',
-                    gap_from_classical=gap,
-                    metadata=meta
-                ))
-                ml_count += 1
-
-                if ml_count % 5 == 0:
-                    print(f"  Progress: {ml_count}/{len(graphs)}")
-
-            except Exception as e:
-                print(f"  ✗ ML failed on {instance_id}: {e}")
-
-        print(f"  ✅ {ml_count} results\n")
-    else:
-        print("  ⚠️  Training failed - no ML results\n")
-except Exception as e:
-    print(f"  ✗ ML training error: {e}\n")
-    import traceback
-    traceback.print_exc()
-
-# ==================== CPP-LC (CORRECTED) ====================
-print("="*70)
-print("4/4: CPP-LC (Load-Dependent - FIXED!)")
-print("="*70)
-
-cpp_lc_count = 0
-for i, (instance_id, G) in enumerate(graphs.items(), 1):
-    try:
-        # GENERATE realistic demands (graphs don't have demand attributes!)
-        import random
-        random.seed(42 + i)  # Deterministic
-
-        edge_demands = {}
-        for u, v in G.edges():
-            # Demand proportional to edge weight
-            base_demand = G[u][v].get('weight', 1.0) * random.uniform(0.5, 2.0)
-            edge_demands[(u, v)] = base_demand
-            edge_demands[(v, u)] = base_demand
-
-        if not edge_demands:
-            print(f"  ⚠️  {instance_id}: No edges, skipping")
-            continue
-
-        total_demand = sum(edge_demands.values()) / 2
-        capacity = total_demand * 0.4  # Tight capacity (40% of total)
-        
-        start = time.time()
-        cost, tour, meta = solve_cpp_lc_corrected(G, edge_demands, capacity)
-        runtime = time.time() - start
-        
-        gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
-        
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='cpp_lc_corrected',
-            variant='load_dependent',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=G.number_of_nodes(),
-            num_edges=G.number_of_edges(),
-            network_family='benchmark',
-            size='various',
-            gap_from_classical=gap,
-            metadata=meta
-        ))
-        cpp_lc_count += 1
-        
-        if cpp_lc_count % 5 == 0 and cpp_lc_count > 0:
-            print(f"  Progress: {cpp_lc_count} CPP-LC results")
-            
-    except Exception as e:
-        if i <= 3:  # Print first few errors for debugging
-            print(f"  ✗ CPP-LC failed on {instance_id}: {e}")
-
-print(f"  ✅ {cpp_lc_count} CPP-LC results\n")
-
-# ==================== SAVE ====================
-print("="*70)
-print("SAVING RESULTS")
-print("="*70)
-
-df = pd.DataFrame([r.to_dict() for r in results])
-
-output_dir = Path("results_final_complete")
-output_dir.mkdir(exist_ok=True)
-
-df.to_csv(output_dir / "all_results.csv", index=False)
-print(f"  ✓ {output_dir / 'all_results.csv'}")
-
-summary = df.groupby('algorithm').agg({
-    'cost': ['count', 'mean', 'std'],
-    'gap_from_classical': ['mean', 'std']
-}).round(3)
-
-print("\n" + "="*70)
-print("SUMMARY")
-print("="*70)
-print(summary)
-
-summary.to_csv(output_dir / "summary.csv")
-
-# Key findings
-print("\n" + "="*70)
-print("KEY FINDINGS")
-print("="*70)
-
-for algo in df['algorithm'].unique():
-    count = len(df[df['algorithm'] == algo])
-    gap = df[df['algorithm'] == algo]['gap_from_classical'].mean()
-    print(f"  {algo}: {count} instances, {gap:.1f}% avg gap")
+Entry point for pipeline.run_pipeline(mode='final')
+"""
 
-# CPP-LC specific
-cpp_lc = df[df['algorithm'] == 'cpp_lc_corrected']
-if not cpp_lc.empty:
-    avg_increase = cpp_lc['gap_from_classical'].mean()
-    print(f"\n🔥 CPP-LC cost increase: {avg_increase:.1f}%")
-    if avg_increase > 0:
-        print("   ✅ POSITIVE (as expected!)")
-    else:
-        print("   ⚠️  Still negative - check implementation")
+from pipeline import run_pipeline
 
-# London specifically
-london_results = df[df['instance_id'] == 'london_real']
-if not london_results.empty:
-    print(f"\n🌍 LONDON RESULTS:")
-    for algo in london_results['algorithm'].unique():
-        cost = london_results[london_results['algorithm'] == algo]['cost'].values[0]
-        gap = london_results[london_results['algorithm'] == algo]['gap_from_classical'].values[0]
-        print(f"   {algo}: cost={cost:.1f}, gap={gap:.1f}%")
 
-elapsed = time.time() - start_time
+def run_final_pipeline():
+    """Run every algorithm on every loaded graph and save the results"""
+    return run_pipeline(mode='final')
 
-print("\n" + "="*70)
-print("✅ COMPLETE!")
-print("="*70)
-print(f"Total results: {len(results)}")
-print(f"Total graphs: {len(graphs)}")
-print(f"Total time: {elapsed/60:.1f} minutes")
 
-print("\n🎯 Next: Generate plots and write paper!")
-print("   python3 complete_plots.py")
+if __name__ == "__main__":
+    run_final_pipeline()
@@ -4,18 +4,64 @@ All results: Classical, Greedy, CPP-LC, ML/RL, Real Data
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Headless batch rendering, no GUI canvas managers
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from pathlib import Path
 
-plt.rcParams['figure.dpi'] = 300
+plt.rcParams['figure.dpi'] = 100  # Composition only; PNGs are saved at 300 dpi
 plt.rcParams['font.size'] = 10
+plt.ioff()
+
+# Only the columns the figures use; categories hash each name once for groupby
+RESULT_COLUMNS = ['instance_id', 'algorithm', 'cost', 'gap_from_classical',
+                  'runtime_seconds', 'network_family', 'num_nodes']
+RESULT_DTYPES = {
+    'algorithm': 'category',
+    'network_family': 'category',
+    'cost': 'float32',
+    'gap_from_classical': 'float32',
+    'runtime_seconds': 'float32',
+    'num_nodes': 'int32',
+}
+
+# Shared x-axis order for every figure (baseline first, then heuristics, CPP-LC, ML)
+ALGORITHM_ORDER = ['classical_cpp', 'greedy', 'cpp_lc_fast', 'cpp_lc_corrected',
+                   'ml_learning', 'ml_improved']
+
+def save_both(fig, base):
+    """Write fig as <base>.pdf and <base>.png (300 dpi)"""
+    fig.savefig(base.with_suffix('.pdf'))
+    fig.savefig(base.with_suffix('.png'), dpi=300)
+
+
+def bar_series(ax, s, **kwargs):
+    """Bar chart of a Series straight from its values (no pandas plotting layer)"""
+    x = np.arange(len(s))
+    ax.bar(x, s.to_numpy(), **kwargs)
+    ax.set_xticks(x, s.index.astype(str))
+
+
+def bar_frame(ax, frame, width=0.7):
+    """Grouped bars, one group per row and one bar (and legend entry) per column"""
+    x = np.arange(len(frame))
+    w = width / frame.shape[1]
+    for i, col in enumerate(frame.columns):
+        ax.bar(x + (i - (frame.shape[1] - 1) / 2) * w, frame[col].to_numpy(), w, label=str(col))
+    ax.set_xticks(x, frame.index.astype(str))
+
 
 def generate_complete_figures():
     """Generate all figures for paper"""
     
-    df = pd.read_csv("results_final_complete/all_results.csv")
+    df = pd.read_csv("results_final_complete/all_results.csv",
+                     usecols=RESULT_COLUMNS, dtype=RESULT_DTYPES)
+    # One ordered algorithm dtype for all figures; unknown names go last, absent ones are dropped
+    extra = sorted(set(df['algorithm'].cat.categories) - set(ALGORITHM_ORDER))
+    df['algorithm'] = (df['algorithm'].cat.set_categories(ALGORITHM_ORDER + extra, ordered=True)
+                       .cat.remove_unused_categories())
     output_dir = Path("figures_complete")
     output_dir.mkdir(exist_ok=True)
     
@@ -25,7 +71,7 @@ def generate_complete_figures():
     
     # Figure 1: Overall Algorithm Comparison
     print("\n📊 Figure 1: Algorithm Comparison...")
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6), layout='constrained')
     
     sns.boxplot(data=df, x='algorithm', y='cost', ax=ax1)
     ax1.set_xlabel('Algorithm')
@@ -44,10 +90,9 @@ def generate_complete_figures():
     ax2.grid(True, alpha=0.3, axis='y')
     plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig1_algorithm_comparison.pdf")
-    fig.savefig(output_dir / "fig1_algorithm_comparison.png", dpi=300)
-    plt.close()
+    save_both(fig, output_dir / "fig1_algorithm_comparison")
+    plt.close(fig)
+    del gap_data
     print("   ✓ Saved")
     
     # Figure 2: CPP-LC Cost Increase
@@ -55,7 +100,7 @@ def generate_complete_figures():
     cpp_lc = df[df['algorithm'] == 'cpp_lc_fast']
     
     if not cpp_lc.empty:
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
         
         ax.hist(cpp_lc['gap_from_classical'], bins=20, alpha=0.7, 
                color='steelblue', edgecolor='black')
@@ -70,21 +115,21 @@ def generate_complete_figures():
         ax.legend()
         ax.grid(True, alpha=0.3, axis='y')
         
-        plt.tight_layout()
-        fig.savefig(output_dir / "fig2_cpp_lc_impact.pdf")
-        fig.savefig(output_dir / "fig2_cpp_lc_impact.png", dpi=300)
-        plt.close()
+        save_both(fig, output_dir / "fig2_cpp_lc_impact")
+        plt.close(fig)
         print("   ✓ Saved")
     else:
         print("   ⚠️  No CPP-LC data")
+    del cpp_lc
     
     # Figure 3: Learning Performance  
     print("\n📊 Figure 3: ML/RL Performance...")
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
     
     algorithms = ['classical_cpp', 'greedy', 'ml_learning']
-    data_for_plot = df[df['algorithm'].isin(algorithms)]
+    data_for_plot = df[df['algorithm'].isin(algorithms)].copy()
+    data_for_plot['algorithm'] = data_for_plot['algorithm'].cat.remove_unused_categories()
     
     sns.violinplot(data=data_for_plot, x='algorithm', y='cost', ax=ax)
     ax.set_xlabel('Algorithm')
@@ -93,45 +138,27 @@ def generate_complete_figures():
     ax.grid(True, alpha=0.3, axis='y')
     plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig3_ml_performance.pdf")
-    fig.savefig(output_dir / "fig3_ml_performance.png", dpi=300)
-    plt.close()
+    save_both(fig, output_dir / "fig3_ml_performance")
+    plt.close(fig)
+    del data_for_plot
     print("   ✓ Saved")
     
     # Figure 4: Real-World Validation (London)
     print("\n📊 Figure 4: Real-World Validation...")
     
-    real_data = df[df['network_family'] == 'osm_real']
-    synthetic_data = df[df['network_family'] != 'osm_real']
+    fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    # Compare performance on real vs synthetic: one grouped pass, real/synthetic as a column
+    is_real = (df['network_family'] == 'osm_real').rename('Data')
+    comp_pivot = (df.groupby(['algorithm', is_real])['gap_from_classical'].mean()
+                  .unstack()
+                  .rename(columns={True: 'Real (London)', False: 'Synthetic'})
+                  .rename_axis(index='Algorithm', columns='Data')
+                  .sort_index(axis=1))
+    del is_real  # Only the small pivot is kept; no real/synthetic subsets of df
     
-    # Compare performance on real vs synthetic
-    comparison_data = []
-    for algo in df['algorithm'].unique():
-        real_algo = real_data[real_data['algorithm'] == algo]
-        synth_algo = synthetic_data[synthetic_data['algorithm'] == algo]
-        
-        if not real_algo.empty:
-            comparison_data.append({
-                'Algorithm': algo,
-                'Data': 'Real (London)',
-                'Gap': real_algo['gap_from_classical'].mean()
-            })
-        
-        if not synth_algo.empty:
-            comparison_data.append({
-                'Algorithm': algo,
-                'Data': 'Synthetic',
-                'Gap': synth_algo['gap_from_classical'].mean()
-            })
-    
-    if comparison_data:
-        comp_df = pd.DataFrame(comparison_data)
-        comp_pivot = comp_df.pivot(index='Algorithm', columns='Data', values='Gap')
-        
-        comp_pivot.plot(kind='bar', ax=ax, width=0.7)
+    if not comp_pivot.empty:
+        bar_frame(ax, comp_pivot, width=0.7)
         ax.set_xlabel('Algorithm')
         ax.set_ylabel('Mean Optimality Gap (%)')
         ax.set_title('Performance: Real-World vs. Synthetic Networks')
@@ -139,22 +166,25 @@ def generate_complete_figures():
         ax.grid(True, alpha=0.3, axis='y')
         plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
         
-        plt.tight_layout()
-        fig.savefig(output_dir / "fig4_real_vs_synthetic.pdf")
-        fig.savefig(output_dir / "fig4_real_vs_synthetic.png", dpi=300)
-        plt.close()
+        save_both(fig, output_dir / "fig4_real_vs_synthetic")
+        plt.close(fig)
         print("   ✓ Saved")
     else:
+        plt.close(fig)
         print("   ⚠️  No real data for comparison")
+    del comp_pivot
     
     # Figure 5: Comprehensive Summary
     print("\n📊 Figure 5: Comprehensive Summary...")
     
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    # Group once and reuse for every panel
+    gb = df.groupby('algorithm', observed=True)
+    
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10), layout='constrained')
     
     # Top-left: Cost by algorithm
     ax = axes[0, 0]
-    df.groupby('algorithm')['cost'].mean().plot(kind='bar', ax=ax, color='steelblue')
+    bar_series(ax, gb['cost'].mean(), color='steelblue')
     ax.set_xlabel('Algorithm')
     ax.set_ylabel('Mean Cost')
     ax.set_title('(a) Mean Solution Cost')
@@ -163,7 +193,7 @@ def generate_complete_figures():
     
     # Top-right: Runtime
     ax = axes[0, 1]
-    df.groupby('algorithm')['runtime_seconds'].mean().plot(kind='bar', ax=ax, color='coral')
+    bar_series(ax, gb['runtime_seconds'].mean(), color='coral')
     ax.set_xlabel('Algorithm')
     ax.set_ylabel('Mean Runtime (s)')
     ax.set_title('(b) Computational Efficiency')
@@ -172,8 +202,8 @@ def generate_complete_figures():
     
     # Bottom-left: Gap distribution
     ax = axes[1, 0]
-    gap_by_algo = df[df['gap_from_classical'].notna()].groupby('algorithm')['gap_from_classical'].mean()
-    gap_by_algo.plot(kind='bar', ax=ax, color='green', alpha=0.7)
+    gap_by_algo = gb['gap_from_classical'].mean().dropna()  # mean() skips NaN gaps
+    bar_series(ax, gap_by_algo, color='green', alpha=0.7)
     ax.set_xlabel('Algorithm')
     ax.set_ylabel('Mean Gap (%)')
     ax.set_title('(c) Optimality Gap')
@@ -183,17 +213,15 @@ def generate_complete_figures():
     
     # Bottom-right: Instance count
     ax = axes[1, 1]
-    df['algorithm'].value_counts().plot(kind='bar', ax=ax, color='purple', alpha=0.7)
+    bar_series(ax, gb.size(), color='purple', alpha=0.7)
     ax.set_xlabel('Algorithm')
     ax.set_ylabel('Number of Instances')
     ax.set_title('(d) Coverage')
     ax.grid(True, alpha=0.3, axis='y')
     plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig5_comprehensive_summary.pdf")
-    fig.savefig(output_dir / "fig5_comprehensive_summary.png", dpi=300)
-    plt.close()
+    save_both(fig, output_dir / "fig5_comprehensive_summary")
+    plt.close(fig)
     print("   ✓ Saved")
     
     print("\n" + "="*70)
@@ -214,10 +242,9 @@ def generate_complete_figures():
     print(f"Unique instances: {df['instance_id'].nunique()}")
     
     print("\nOptimality gaps:")
-    for algo in df['algorithm'].unique():
-        gap = df[df['algorithm'] == algo]['gap_from_classical'].mean()
-        if not np.isnan(gap):
-            print(f"  {algo}: {gap:.1f}%")
+    mean_gaps = df.groupby('algorithm', observed=True, sort=False)['gap_from_classical'].mean().dropna()
+    for algo, gap in mean_gaps.items():
+        print(f"  {algo}: {gap:.1f}%")
     
     # CPP-LC finding
     cpp_lc = df[df['algorithm'] == 'cpp_lc_fast']
@@ -6,88 +6,131 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-import networkx as nx
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
 from simple_ml_cpp import SimpleMLCPP
 from cpp_adapters import solve_classical_cpp
+from pipeline import CACHE_DIR, load_graph_cached, edges_to_node_sequence
 
-print("="*70)
-print("ML TRAINING DEBUGGER")
-print("="*70)
-
-# Load some graphs
-print("\n1. Loading graphs...")
-graphs = []
-data_dir = Path("data")
-for i, gml_file in enumerate(list(data_dir.glob("*.gml"))[:10]):
-    try:
-        G = nx.read_gml(str(gml_file))
-        graphs.append(G)
-        print(f"  ✓ Loaded {gml_file.name}")
-    except Exception as e:
-        print(f"  ✗ Failed {gml_file.name}: {e}")
 
-print(f"\nLoaded {len(graphs)} graphs")
+def _classical_tour(G):
+    """Classical CPP node tour for one graph (runs in a worker process)"""
+    result = solve_classical_cpp(G)
+    return edges_to_node_sequence(result['tour']) if result['tour'] else []
 
-# Generate training data
-print("\n2. Generating training data...")
-training_data = []
 
-for i, G in enumerate(graphs):
-    try:
-        cost, tour = solve_classical_cpp(G)
-        training_data.append((G, tour))
-        print(f"  ✓ Graph {i+1}: {G.number_of_nodes()} nodes, tour length {len(tour)}")
-    except Exception as e:
-        print(f"  ✗ Graph {i+1} failed: {e}")
+def run_debug():
+    """Train and test SimpleMLCPP on up to 10 data/*.gml graphs"""
+    print("="*70)
+    print("ML TRAINING DEBUGGER")
+    print("="*70)
 
-print(f"\nGenerated {len(training_data)} training examples")
+    # Load some graphs
+    print("\n1. Loading graphs...")
+    data_dir = Path("data")
+    gml_files = list(data_dir.glob("*.gml"))[:10]
 
-# Try to train
-print("\n3. Training ML model...")
-ml_solver = SimpleMLCPP()
+    # Training set is cached, keyed by the graph files' mtime + size
+    cache_file = CACHE_DIR / "debug_ml_training.pkl"
+    stamps = tuple(sorted((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in gml_files))
+    cached = None
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_stamps, graphs, training_data = pickle.load(f)
+            if cached_stamps == stamps:
+                cached = True
+        except Exception:
+            pass  # Stale or corrupt cache - rebuild below
 
-try:
-    success = ml_solver.train_from_solutions(training_data)
-    
-    if success:
-        print("  ✅ Training succeeded!")
-        print(f"  Model trained: {ml_solver.trained}")
+    if cached:
+        print(f"  ✓ Loaded {len(graphs)} graphs + training data from cache ({cache_file})")
     else:
-        print("  ❌ Training returned False")
-        print("  This means no training data was extracted")
-        
-except Exception as e:
-    print(f"  ❌ Training crashed: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Test inference
-if ml_solver.trained:
-    print("\n4. Testing inference...")
-    
-    test_graph = graphs[0]
+        graphs = []
+        for i, gml_file in enumerate(gml_files):
+            try:
+                G = load_graph_cached(gml_file)
+                graphs.append(G)
+                print(f"  ✓ Loaded {gml_file.name}")
+            except Exception as e:
+                print(f"  ✗ Failed {gml_file.name}: {e}")
+
+    print(f"\nLoaded {len(graphs)} graphs")
+
+    # Generate training data
+    print("\n2. Generating training data...")
+    if not cached:
+        training_data = []
+
+        # Graphs are independent - solve them on all cores, report in load order
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            futures = [ex.submit(_classical_tour, G) for G in graphs]
+            for i, (G, fut) in enumerate(zip(graphs, futures)):
+                try:
+                    tour = fut.result()
+                    training_data.append((G, tour))
+                    print(f"  ✓ Graph {i+1}: {G.number_of_nodes()} nodes, tour length {len(tour)}")
+                except Exception as e:
+                    print(f"  ✗ Graph {i+1} failed: {e}")
+
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump((stamps, graphs, training_data), f, protocol=5)
+
+    print(f"\nGenerated {len(training_data)} training examples")
+
+    # Try to train
+    print("\n3. Training ML model...")
+    ml_solver = SimpleMLCPP()
+
     try:
-        cost, tour, meta = ml_solver.solve_with_learning(test_graph)
-        print(f"  ✓ Inference worked!")
-        print(f"  Cost: {cost}")
-        print(f"  Tour length: {len(tour)}")
-        print(f"  Method: {meta.get('method', 'unknown')}")
+        success = ml_solver.train_from_solutions(training_data)
+
+        if success:
+            print("  ✅ Training succeeded!")
+            print(f"  Model trained: {ml_solver.trained}")
+        else:
+            print("  ❌ Training returned False")
+            print("  This means no training data was extracted")
+
     except Exception as e:
-        print(f"  ✗ Inference failed: {e}")
+        print(f"  ❌ Training crashed: {e}")
         import traceback
         traceback.print_exc()
-else:
-    print("\n4. Skipping inference (model not trained)")
-
-print("\n" + "="*70)
-print("DIAGNOSIS")
-print("="*70)
-
-if ml_solver.trained:
-    print("✅ ML is working! Integration issue in main pipeline.")
-else:
-    print("❌ ML training is broken. Check simple_ml_cpp.py")
-    print("\nLikely issues:")
-    print("  - Feature extraction failing")
-    print("  - Tour format incompatible")
-    print("  - No valid training pairs generated")
+
+    # Test inference
+    if ml_solver.trained:
+        print("\n4. Testing inference...")
+
+        test_graph = graphs[0]
+        try:
+            cost, tour, meta = ml_solver.solve_with_learning(test_graph)
+            print(f"  ✓ Inference worked!")
+            print(f"  Cost: {cost}")
+            print(f"  Tour length: {len(tour)}")
+            print(f"  Method: {meta.get('method', 'unknown')}")
+        except Exception as e:
+            print(f"  ✗ Inference failed: {e}")
+            import traceback
+            traceback.print_exc()
+    else:
+        print("\n4. Skipping inference (model not trained)")
+
+    print("\n" + "="*70)
+    print("DIAGNOSIS")
+    print("="*70)
+
+    if ml_solver.trained:
+        print("✅ ML is working! Integration issue in main pipeline.")
+    else:
+        print("❌ ML training is broken. Check simple_ml_cpp.py")
+        print("\nLikely issues:")
+        print("  - Feature extraction failing")
+        print("  - Tour format incompatible")
+        print("  - No valid training pairs generated")
+
+
+if __name__ == "__main__":
+    run_debug()
@@ -10,6 +10,8 @@ import networkx as nx
 import json
 from datetime import datetime
 
+from osm_utils import WESTMINSTER_BBOX, osm_to_simple_graph, pbf_bbox_to_graph
+
 def download_london_geofabrik():
     """
     Download Greater London from Geofabrik
@@ -39,16 +41,24 @@ def download_london_geofabrik():
         print(f"   This is a single file download (fast!)\n")
         
         try:
-            # Download with progress
-            def progress(block_num, block_size, total_size):
-                downloaded = block_num * block_size
-                if total_size > 0:
-                    percent = downloaded / total_size * 100
-                    mb_downloaded = downloaded / 1024 / 1024
-                    mb_total = total_size / 1024 / 1024
-                    print(f"\r  Progress: {percent:.1f}% ({mb_downloaded:.1f}/{mb_total:.1f} MB)", end='')
+            # Stream in 1 MB chunks, reporting progress every 10 MB
+            chunk_size = 1 << 20
+            report_every = 10 << 20
+            
+            with urllib.request.urlopen(url) as resp, open(pbf_file, 'wb') as f:
+                total = int(resp.headers.get('Content-Length', 0))
+                downloaded = 0
+                next_mark = report_every
+                
+                while chunk := resp.read(chunk_size):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    if downloaded >= next_mark:
+                        mb_downloaded = downloaded / 1024 / 1024
+                        mb_total = total / 1024 / 1024
+                        print(f"\r  Progress: {mb_downloaded:.0f}/{mb_total:.0f} MB", end='')
+                        next_mark += report_every
             
-            urllib.request.urlretrieve(url, pbf_file, progress)
             print("\n  ✅ Download complete!")
             
         except Exception as e:
@@ -61,7 +71,7 @@ def download_london_geofabrik():
 def extract_small_network_from_pbf(pbf_file):
     """
     Extract a small network from the PBF file
-    Uses osmium to extract a bounding box, then osmnx to convert
+    Reads the Westminster bounding box locally with pyrosm (no API calls)
     """
     
     print("\n" + "="*70)
@@ -69,52 +79,22 @@ def extract_small_network_from_pbf(pbf_file):
     print("="*70)
     
     try:
-        import osmnx as ox
-        
-        # Extract small area using osmnx (it can read PBF but slower)
-        # Better: use bbox query which is still fast
         print("\n📍 Extracting Westminster area...")
-        print("   Using direct bbox query (fast)\n")
+        print("   Reading bbox from the local PBF\n")
         
         # Westminster bbox (Big Ben area) - small area
-        bbox = (51.502, 51.498, -0.122, -0.128)  # ~400m area
-        
-        G = ox.graph_from_bbox(
-            bbox=bbox,
-            network_type='drive',
-            simplify=True
-        )
+        bbox = WESTMINSTER_BBOX
         
-        print(f"   ✓ Extracted: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+        G_final = pbf_bbox_to_graph(pbf_file, bbox)
         
-        # Convert to simple graph
-        G_simple = G.to_undirected()
-        G_final = nx.Graph()
-        
-        node_mapping = {node: i for i, node in enumerate(G_simple.nodes())}
-        G_final.add_nodes_from(range(len(node_mapping)))
-        
-        for u, v, data in G_simple.edges(data=True):
-            u_idx = node_mapping[u]
-            v_idx = node_mapping[v]
-            length = data.get('length', 100.0)
-            weight = length / 100.0
-            
-            if not G_final.has_edge(u_idx, v_idx):
-                G_final.add_edge(u_idx, v_idx, weight=weight, length=length)
-        
-        # Ensure connected
-        if not nx.is_connected(G_final):
-            largest_cc = max(nx.connected_components(G_final), key=len)
-            G_final = G_final.subgraph(largest_cc).copy()
-            G_final = nx.convert_node_labels_to_integers(G_final)
+        print(f"   ✓ Extracted: {G_final.number_of_nodes()} nodes, {G_final.number_of_edges()} edges")
         
         # Save
         output_dir = Path("benchmarks/osm_derived")
         output_dir.mkdir(parents=True, exist_ok=True)
         
         graphml_file = output_dir / "osm_london_westminster.graphml"
-        nx.write_graphml(G_final, graphml_file)
+        nx.write_graphml(G_final, str(graphml_file), prettyprint=False)
         
         metadata = {
             'instance_id': 'osm_london_westminster',
@@ -163,7 +143,7 @@ def quick_method():
         import osmnx as ox
         
         # Very small Westminster area
-        bbox = (51.502, 51.498, -0.122, -0.128)
+        bbox = WESTMINSTER_BBOX
         
         print("📍 Downloading Westminster (Big Ben, 400m area)...")
         
@@ -175,33 +155,14 @@ def quick_method():
         
         print(f"   ✓ Downloaded: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
         
-        # Convert
-        G_simple = G.to_undirected()
-        G_final = nx.Graph()
-        
-        node_mapping = {node: i for i, node in enumerate(G_simple.nodes())}
-        G_final.add_nodes_from(range(len(node_mapping)))
-        
-        for u, v, data in G_simple.edges(data=True):
-            u_idx = node_mapping[u]
-            v_idx = node_mapping[v]
-            length = data.get('length', 100.0)
-            weight = length / 100.0
-            
-            if not G_final.has_edge(u_idx, v_idx):
-                G_final.add_edge(u_idx, v_idx, weight=weight, length=length)
-        
-        # Ensure connected
-        if not nx.is_connected(G_final):
-            largest_cc = max(nx.connected_components(G_final), key=len)
-            G_final = G_final.subgraph(largest_cc).copy()
-            G_final = nx.convert_node_labels_to_integers(G_final)
+        # Convert to simple integer-labelled graph (largest component)
+        G_final = osm_to_simple_graph(G)
         
         # Save
         output_dir = Path("benchmarks/osm_derived")
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        nx.write_graphml(G_final, output_dir / "osm_london.graphml")
+        nx.write_graphml(G_final, str(output_dir / "osm_london.graphml"), prettyprint=False)
         
         with open(output_dir / "osm_london_metadata.json", 'w') as f:
             json.dump({
@@ -219,6 +180,11 @@ def quick_method():
         return None
 
 
+def quick_london_download():
+    """Entry point used by the pipelines: quick bbox download, or None on failure"""
+    return quick_method()
+
+
 if __name__ == "__main__":
     print("\n🌍 LONDON NETWORK LOADER\n")
     
@@ -8,6 +8,8 @@ import networkx as nx
 import json
 from datetime import datetime
 
+from osm_utils import WESTMINSTER_BBOX, pbf_bbox_to_graph
+
 def extract_london_from_existing_pbf():
     """
     Extract small London network from the PBF file you already have!
@@ -30,49 +32,21 @@ def extract_london_from_existing_pbf():
     print(f"\n📍 Extracting small Westminster area...")
     
     try:
-        import osmnx as ox
-        
-        # Small Westminster bbox
-        bbox = (51.502, 51.498, -0.122, -0.128)  # ~400m area
-        
-        print("   Querying OSM for Westminster...")
-        
-        G = ox.graph_from_bbox(
-            bbox=bbox,
-            network_type='drive',
-            simplify=True
-        )
-        
-        print(f"   ✓ Downloaded: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-        
-        # Convert to simple graph
-        G_simple = G.to_undirected()
-        G_final = nx.Graph()
+        # Small Westminster bbox (~400m area)
+        bbox = WESTMINSTER_BBOX
         
-        node_mapping = {node: i for i, node in enumerate(G_simple.nodes())}
-        G_final.add_nodes_from(range(len(node_mapping)))
+        print("   Reading Westminster from the local PBF...")
         
-        for u, v, data in G_simple.edges(data=True):
-            u_idx = node_mapping[u]
-            v_idx = node_mapping[v]
-            length = data.get('length', 100.0)
-            weight = length / 100.0
-            
-            if not G_final.has_edge(u_idx, v_idx):
-                G_final.add_edge(u_idx, v_idx, weight=weight, length=length)
+        G_final = pbf_bbox_to_graph(pbf_file, bbox)
         
-        # Ensure connected
-        if not nx.is_connected(G_final):
-            largest_cc = max(nx.connected_components(G_final), key=len)
-            G_final = G_final.subgraph(largest_cc).copy()
-            G_final = nx.convert_node_labels_to_integers(G_final)
+        print(f"   ✓ Extracted: {G_final.number_of_nodes()} nodes, {G_final.number_of_edges()} edges")
         
         # Save
         output_dir = Path("benchmarks/osm_derived")
         output_dir.mkdir(parents=True, exist_ok=True)
         
         graphml_file = output_dir / "osm_london_westminster.graphml"
-        nx.write_graphml(G_final, graphml_file)
+        nx.write_graphml(G_final, str(graphml_file), prettyprint=False)
         
         metadata = {
             'instance_id': 'osm_london_westminster',
@@ -121,5 +95,4 @@ if __name__ == "__main__":
         print("\n" + "="*70)
         print("EXTRACTION FAILED")
         print("="*70)
-        print("\nLikely cause: Network connectivity to OSM API")
-        print("The PBF is local, but osmnx still needs API access")
+        print("\nLikely cause: pyrosm not installed or PBF file missing")
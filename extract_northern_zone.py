@@ -5,10 +5,13 @@ Using pyrosm to handle PBF files
 
 from pyrosm import OSM, get_data
 import networkx as nx
+import numpy as np
 from pathlib import Path
 import json
 import random
 
+from osm_utils import bfs_sample, largest_component, scale_lengths
+
 print("="*70)
 print("EXTRACTING NORTHERN ZONE NETWORK")
 print("="*70)
@@ -31,67 +34,48 @@ try:
 
     print(f"   Extracted {len(edges)} edges, {len(nodes)} nodes")
 
-    # Convert to NetworkX graph
+    # Build the undirected graph straight from the edge table
+    # (skips the MultiDiGraph from osm.to_graph and its to_undirected() copy)
     print("   Converting to NetworkX...")
-    G = osm.to_graph(nodes, edges, graph_type="networkx")
+    G = nx.Graph()
+    G.add_nodes_from((n, {'x': x, 'y': y}) for n, x, y in
+                     zip(nodes['id'], nodes['lon'], nodes['lat']))
+    # Missing (NaN) lengths get no attribute, so the weight falls back to 1.0
+    G.add_edges_from((u, v) if length != length else (u, v, {'length': length})
+                     for u, v, length in zip(edges['u'], edges['v'], edges['length']))
 
     print(f"   Initial graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
 
-    # Convert to undirected
-    if G.is_directed():
-        G = G.to_undirected()
-        print(f"   Converted to undirected")
-
     # Sample if too large
     target_nodes = 200
     if G.number_of_nodes() > target_nodes:
         print(f"   Sampling {target_nodes} nodes...")
 
         # Get largest connected component first
-        if not nx.is_connected(G):
-            largest_cc = max(nx.connected_components(G), key=len)
-            G = G.subgraph(largest_cc).copy()
+        n_before = G.number_of_nodes()
+        G = largest_component(G)
+        if G.number_of_nodes() < n_before:
             print(f"   Largest component: {G.number_of_nodes()} nodes")
 
-        # BFS sampling
+        # BFS sampling from a random start: the first target_nodes discovered
+        # are the sample (same walk as sample_london.py, over CSR arrays)
         random.seed(42)
         start_node = random.choice(list(G.nodes()))
-
-        sampled_nodes = set()
-        queue = [start_node]
-        visited = {start_node}
-
-        while len(sampled_nodes) < target_nodes and queue:
-            current = queue.pop(0)
-            sampled_nodes.add(current)
-
-            # Add neighbors
-            neighbors = list(G.neighbors(current))
-            random.shuffle(neighbors)
-
-            for neighbor in neighbors[:3]:
-                if neighbor not in visited and len(sampled_nodes) < target_nodes:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
+        sampled_nodes = bfs_sample(G, start_node, target_nodes)
 
         G = G.subgraph(sampled_nodes).copy()
         print(f"   Sampled: {G.number_of_nodes()} nodes")
 
-    # Add weights
-    for u, v, data in G.edges(data=True):
-        if 'length' in data:
-            # Convert to km
-            G[u][v]['weight'] = data['length'] / 1000.0
-        else:
-            G[u][v]['weight'] = 1.0
-
-    # Ensure connected
-    if not nx.is_connected(G):
-        largest = max(nx.connected_components(G), key=len)
-        G = G.subgraph(largest).copy()
+    # Add weights (length converted to km) in one scale_lengths pass;
+    # a missing length counts as 1 km (weight 1.0)
+    edge_list = list(G.edges(data=True))
+    lengths = np.fromiter((d.get('length', 1000.0) for _, _, d in edge_list),
+                          dtype=np.float64, count=len(edge_list))
+    weights = scale_lengths(lengths, 1e-3, 1000.0).tolist()
+    nx.set_edge_attributes(G, {(u, v): w for (u, v, _), w in zip(edge_list, weights)}, 'weight')
 
-    # Convert node labels to integers
-    G = nx.convert_node_labels_to_integers(G)
+    # Ensure connected, with integer node labels
+    G = largest_component(G)
 
     print(f"\n✅ Final network:")
     print(f"   Nodes: {G.number_of_nodes()}")
@@ -103,7 +87,7 @@ try:
     output_dir.mkdir(parents=True, exist_ok=True)
 
     output_file = output_dir / "osm_northern_zone_sample.graphml"
-    nx.write_graphml(G, str(output_file))
+    nx.write_graphml(G, str(output_file), prettyprint=False)
     print(f"\n💾 Saved: {output_file}")
 
     # Metadata
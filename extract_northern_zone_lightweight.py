@@ -5,10 +5,15 @@ Process PBF in chunks with strict memory limits
 
 import subprocess
 import networkx as nx
+import numpy as np
+import pandas as pd
 from pathlib import Path
 import json
 from datetime import datetime
 
+from osm_utils import (OSMIUM_AVAILABLE, largest_component, pbf_bbox_to_graph_streaming,
+                       scale_lengths)
+
 print("="*70)
 print("NORTHERN ZONE EXTRACTION - LIGHTWEIGHT")
 print("="*70)
@@ -26,18 +31,21 @@ print(f"   Size: {pbf_file.stat().st_size / 1024 / 1024:.1f} MB")
 print("\n🔄 Strategy: Extract small bounding box first using osmium...")
 print("   This will create a much smaller file to process")
 
-# Check if osmium is available
-try:
-    result = subprocess.run(['osmium', '--version'],
-                          capture_output=True,
-                          text=True,
-                          timeout=5)
-    has_osmium = result.returncode == 0
-except:
-    has_osmium = False
+# Check if osmium is available (pyosmium in-process, else the osmium-tool CLI)
+if OSMIUM_AVAILABLE:
+    has_osmium = True
+else:
+    try:
+        result = subprocess.run(['osmium', '--version'],
+                              capture_output=True,
+                              text=True,
+                              timeout=5)
+        has_osmium = result.returncode == 0
+    except:
+        has_osmium = False
 
 if has_osmium:
-    print("   ✓ osmium-tool found")
+    print("   ✓ pyosmium found" if OSMIUM_AVAILABLE else "   ✓ osmium-tool found")
 
     # Extract a small bbox (0.1 degree square - roughly 10km x 10km)
     # This will be MUCH smaller than the full 206MB file
@@ -53,7 +61,8 @@ if has_osmium:
     small_pbf = Path("data/northern_zone_small_extract.osm.pbf")
 
     print(f"\n   Extracting bbox: {bbox}")
-    print(f"   Output: {small_pbf}")
+    if not OSMIUM_AVAILABLE:
+        print(f"   Output: {small_pbf}")
 
     cmd = [
         'osmium', 'extract',
@@ -65,40 +74,50 @@ if has_osmium:
     ]
 
     try:
-        subprocess.run(cmd, check=True, timeout=120)
-        print(f"   ✓ Small extract created: {small_pbf.stat().st_size / 1024 / 1024:.1f} MB")
-
-        # Now process the SMALL file with pyrosm
-        print("\n🔄 Processing small extract with pyrosm...")
-
-        from pyrosm import OSM
-
-        osm = OSM(str(small_pbf))
-        nodes, edges = osm.get_network(network_type="driving", nodes=True)
-        G = osm.to_graph(nodes, edges, graph_type="networkx")
+        if OSMIUM_AVAILABLE:
+            # One pass of libosmium in this process: the bbox filter and graph
+            # build happen while decoding, so no temp PBF is written and re-read.
+            # Node locations go to an on-disk index to keep memory flat.
+            print("\n🔄 Streaming bbox road segments with pyosmium (no temp file)...")
+            nodes_cache = Path("data/northern_zone_nodes.cache")
+            try:
+                G = pbf_bbox_to_graph_streaming(
+                    pbf_file,
+                    (lat_center + bbox_size, lat_center - bbox_size,
+                     lon_center + bbox_size, lon_center - bbox_size),
+                    weight_scale=1000.0,  # km
+                    location_index=f"sparse_file_array,{nodes_cache}")
+            finally:
+                nodes_cache.unlink(missing_ok=True)
+        else:
+            subprocess.run(cmd, check=True, timeout=120)
+            print(f"   ✓ Small extract created: {small_pbf.stat().st_size / 1024 / 1024:.1f} MB")
+
+            # Now process the SMALL file with pyrosm
+            print("\n🔄 Processing small extract with pyrosm...")
+
+            from pyrosm import OSM
+
+            osm = OSM(str(small_pbf))
+            nodes, edges = osm.get_network(network_type="driving", nodes=True)
+
+            # Undirected simple graph built in two batch calls straight from the
+            # tables; weights in km, a missing length counts as 1 km
+            G = nx.Graph()
+            G.add_nodes_from((n, {'x': x, 'y': y}) for n, x, y in
+                             zip(nodes['id'], nodes['lon'], nodes['lat']))
+            weights = scale_lengths(edges['length'].to_numpy(dtype=np.float64), 1e-3, 1000.0)
+            G.add_weighted_edges_from(zip(edges['u'].tolist(), edges['v'].tolist(),
+                                          weights.tolist()))
 
         print(f"   Extracted {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
 
-        # Convert to undirected
-        if G.is_directed():
-            G = G.to_undirected()
-
-        # Get largest component
-        if not nx.is_connected(G):
-            largest = max(nx.connected_components(G), key=len)
-            G = G.subgraph(largest).copy()
+        # Get largest component, with integer node labels
+        n_before = G.number_of_nodes()
+        G = largest_component(G)
+        if G.number_of_nodes() < n_before:
             print(f"   Largest component: {G.number_of_nodes()} nodes")
 
-        # Add weights
-        for u, v, data in G.edges(data=True):
-            if 'length' in data:
-                G[u][v]['weight'] = data['length'] / 1000.0  # Convert to km
-            else:
-                G[u][v]['weight'] = 1.0
-
-        # Convert to integers
-        G = nx.convert_node_labels_to_integers(G)
-
         print(f"\n✅ Final network:")
         print(f"   Nodes: {G.number_of_nodes()}")
         print(f"   Edges: {G.number_of_edges()}")
@@ -116,8 +135,8 @@ if has_osmium:
             'location': 'Northern Zone, London (OSM extract)',
             'num_nodes': G.number_of_nodes(),
             'num_edges': G.number_of_edges(),
-            'source': 'OpenStreetMap via osmium extract + pyrosm',
-            'extraction_method': 'osmium bbox extract + pyrosm',
+            'source': 'OpenStreetMap via pyosmium' if OSMIUM_AVAILABLE else 'OpenStreetMap via osmium extract + pyrosm',
+            'extraction_method': 'pyosmium streaming bbox filter' if OSMIUM_AVAILABLE else 'osmium bbox extract + pyrosm',
             'extraction_date': datetime.now().isoformat()
         }
 
@@ -132,8 +151,9 @@ if has_osmium:
         print("="*70)
 
         # Clean up small extract
-        small_pbf.unlink()
-        print(f"\n🧹 Cleaned up temporary file: {small_pbf}")
+        if small_pbf.exists():
+            small_pbf.unlink()
+            print(f"\n🧹 Cleaned up temporary file: {small_pbf}")
 
     except subprocess.TimeoutExpired:
         print("   ✗ osmium extract timed out (file too large)")
@@ -165,30 +185,28 @@ if not has_osmium:
 
         print(f"   Extracted {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
 
-        # Convert to undirected simple graph (not multi)
-        G_simple = nx.Graph()
+        # Convert to undirected simple graph (not multi) with integer labels in
+        # one build: OSMnx hands the edges over as a DataFrame, endpoints become
+        # 0..n-1 codes in node order, pairs are canonicalised to (min, max) and
+        # parallel/reverse edges collapse to the minimum length in one groupby
+        edges = ox.graph_to_gdfs(G, nodes=False, fill_edge_geometry=False).reset_index()
+        node_ids = list(G.nodes)
+        codes = np.column_stack([pd.Categorical(edges[end], categories=node_ids).codes
+                                 for end in ('u', 'v')])
+        ends = np.sort(codes, axis=1)
+        pairs = pd.DataFrame({'u': ends[:, 0], 'v': ends[:, 1],
+                              'length': edges['length'].fillna(1000.0).to_numpy()})
+        pairs = pairs.groupby(['u', 'v'], as_index=False, sort=False)['length'].min()
 
-        # Add all nodes
-        G_simple.add_nodes_from(G.nodes(data=True))
-
-        # Add edges with weights
-        for u, v, key, data in G.edges(data=True, keys=True):
-            if not G_simple.has_edge(u, v):
-                # First edge between u-v
-                weight = data.get('length', 1000.0) / 1000.0  # Convert to km
-                G_simple.add_edge(u, v, weight=weight)
-            else:
-                # Multiple edges - take minimum length
-                existing_weight = G_simple[u][v].get('weight', float('inf'))
-                new_weight = data.get('length', 1000.0) / 1000.0
-                G_simple[u][v]['weight'] = min(existing_weight, new_weight)
+        G_simple = nx.Graph()
+        G_simple.add_nodes_from(enumerate(data for _, data in G.nodes(data=True)))
+        weights = scale_lengths(pairs['length'].to_numpy(), 1e-3, 1000.0)  # km
+        G_simple.add_weighted_edges_from(zip(pairs['u'].tolist(), pairs['v'].tolist(),
+                                             weights.tolist()))
 
         G = G_simple
         print(f"   Converted to simple graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
 
-        # Convert to integers
-        G = nx.convert_node_labels_to_integers(G)
-
         print(f"\n✅ Final network:")
         print(f"   Nodes: {G.number_of_nodes()}")
         print(f"   Edges: {G.number_of_edges()}")
@@ -10,303 +10,379 @@ What it includes:
 """
 
 import sys
+import csv
+import pickle
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 import pandas as pd
 import numpy as np
+import argparse
 import time
 import networkx as nx
+from array import array
+from operator import attrgetter
 
 from benchmark_generator import BenchmarkGenerator
 from cpp_adapters import solve_classical_cpp, solve_greedy_heuristic
-from fast_cpp_lc import SimplifiedCPPLC
-from simple_ml_cpp import SimpleMLCPP  # Lightweight learning
-from experimental_pipeline import ExperimentResult
-
-print("="*70)
-print("FAILSAFE PIPELINE - GUARANTEED TO FINISH")
-print("="*70)
-print("\nComponents:")
-print("  ✓ Classical CPP + Greedy (proven fast)")
-print("  ✓ Lightweight ML (regression-based, fast training)")
-print("  ✓ CPP-LC (ultra-fast version)")
-print("  ✓ London real data")
-print("\nEstimated: 30-60 minutes")
-print("\nNote: Using lightweight ML instead of deep RL")
-print("      (Deep RL kept crashing due to memory)")
-
-input("\nPress Enter to start...")
-
-overall_start = time.time()
-
-# Setup
-gen = BenchmarkGenerator(output_dir="benchmarks")
-instance_ids = gen.get_instance_list()
-
-print(f"\n📊 Instances: {len(instance_ids)}")
-
-results = []
-classical_costs = {}
-training_data = []
-
-# ==================== PART 1: BASELINES ====================
-print("\n" + "="*70)
-print("PART 1/4: Baseline Algorithms")
-print("="*70)
-
-print("\n1. Classical CPP...")
-for i, instance_id in enumerate(instance_ids, 1):
-    try:
-        instance = gen.load_instance(instance_id)
-        
-        start = time.time()
-        cost, tour = solve_classical_cpp(instance.graph)
-        runtime = time.time() - start
-        
-        classical_costs[instance_id] = cost
-        training_data.append((instance.graph, tour))
-        
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='classical_cpp',
-            variant='classical',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=instance.metadata.num_nodes,
-            num_edges=instance.metadata.num_edges,
-            network_family=instance.metadata.network_family,
-            size=instance.metadata.size,
-            gap_from_classical=0.0
-        ))
-        
-        if i % 10 == 0:
-            print(f"  Progress: {i}/{len(instance_ids)}")
-            
-    except Exception as e:
-        print(f"  ✗ Error: {e}")
+from simple_ml_cpp import SimpleMLCPP, graph_csr  # Lightweight learning
+from pipeline import CACHE_DIR, ResultStream, edges_to_node_sequence, map_solve, solve_cpp_lc_fast
 
-print(f"  ✅ {len([r for r in results if r.algorithm == 'classical_cpp'])} results")
-
-print("\n2. Greedy...")
-for i, instance_id in enumerate(instance_ids, 1):
-    try:
-        instance = gen.load_instance(instance_id)
-        
-        start = time.time()
-        cost, tour = solve_greedy_heuristic(instance.graph)
-        runtime = time.time() - start
-        
-        gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Per-instance result columns, read from each instance's metadata
+META_FIELDS = ('num_nodes', 'num_edges', 'network_family', 'size')
+ML_TRAIN_LIMIT = 30
+
+
+def main(workers=None, rebuild=False):
+    """
+    Run all four parts and write results_final/
+
+    Kept behind the __main__ guard: the process pools re-import this module
+    in spawn/forkserver workers, which must not re-run the pipeline.
+    """
+    print("="*70)
+    print("FAILSAFE PIPELINE - GUARANTEED TO FINISH")
+    print("="*70)
+    print("\nComponents:")
+    print("  ✓ Classical CPP + Greedy (proven fast)")
+    print("  ✓ Lightweight ML (regression-based, fast training)")
+    print("  ✓ CPP-LC (ultra-fast version)")
+    print("  ✓ London real data")
+    print("\nEstimated: 30-60 minutes")
+    print("\nNote: Using lightweight ML instead of deep RL")
+    print("      (Deep RL kept crashing due to memory)")
+
+    input("\nPress Enter to start...")
+
+    overall_start = time.time()
+
+    # Setup
+    gen = BenchmarkGenerator(output_dir="benchmarks")
+    instance_ids = gen.get_instance_list()
+
+    print(f"\n📊 Instances: {len(instance_ids)}")
+
+    # Load every instance once; all parts below reuse the in-memory pool
+    instances = {}
+    for instance_id in instance_ids:
+        try:
+            instances[instance_id] = gen.load_instance(instance_id)
+        except Exception as e:
+            print(f"  ✗ Failed to load {instance_id}: {e}")
+
+    print(f"   Loaded {len(instances)} into memory")
+
+    # Per-instance result columns read once from the metadata, reused by every part
+    _meta_get = attrgetter(*META_FIELDS)
+    instance_meta = {iid: dict(zip(META_FIELDS, _meta_get(inst.metadata)))
+                     for iid, inst in instances.items()}
+
+    # Rows are appended to all_results.csv as they are produced (no in-memory result list)
+    output_dir = Path("results_final")
+    output_dir.mkdir(exist_ok=True)
+    results = ResultStream(output_dir / "all_results.csv")
+    classical_costs = {}
+    # (graph, int32 node tour) slots for the ML_TRAIN_LIMIT graphs actually used,
+    # allocated once and filled in place; trimmed to n_train after Part 1
+    training_data = [None] * min(ML_TRAIN_LIMIT, len(instances))
+    n_train = 0
+
+    # ==================== PART 1: BASELINES ====================
+    print("\n" + "="*70)
+    print("PART 1/4: Baseline Algorithms")
+    print("="*70)
+
+    # Every instance is independent: each part farms its solves out to a process pool
+    # and consumes the results in instance order
+    graph_args = [(instance.graph,) for instance in instances.values()]
+
+    # Part 1 is deterministic and the slowest part: its outputs are checkpointed,
+    # keyed by the instance pickles' mtime + size, so a rerun after a crash in
+    # Parts 2-4 resumes here instead of re-solving every baseline
+    part1_file = CACHE_DIR / ("failsafe_part1.pkl.zst" if ZSTD_AVAILABLE else "failsafe_part1.pkl")
+    part1_open = zstandard.open if ZSTD_AVAILABLE else open
+    stamps = tuple(
+        (iid, p.stat().st_mtime_ns, p.stat().st_size)
+        for iid, p in ((iid, gen.output_dir / inst.metadata.network_family / f"{iid}.pkl")
+                       for iid, inst in instances.items()))
+    part1 = None
+    if part1_file.exists() and not rebuild:
+        try:
+            with part1_open(part1_file, 'rb') as f:
+                part1 = pickle.load(f)
+            if part1['stamps'] != stamps:
+                part1 = None
+        except Exception:
+            part1 = None  # Stale or corrupt checkpoint - re-solve below
+
+    if part1 is not None:
+        print(f"\n  ✓ Restored baselines from checkpoint ({part1_file}, --rebuild to re-solve)")
+        classical_costs = part1['classical_costs']
+        training_data = part1['training_data']
+        for row in part1['rows']:
+            results.add(**row)
+        print(f"  ✅ {results.counts['classical_cpp']} classical + {results.counts['greedy']} greedy results")
+    else:
+        print("\n1. Classical CPP...")
+        solved = map_solve(solve_classical_cpp, graph_args, workers)
+        for i, ((instance_id, instance), out) in enumerate(zip(instances.items(), solved), 1):
+            try:
+                if isinstance(out, Exception):
+                    raise out
+                result, runtime = out
+                cost, tour = result['cost'], result['tour']
+                
+                classical_costs[instance_id] = cost
+                if n_train < len(training_data):
+                    node_tour = array('i', edges_to_node_sequence(tour) if tour else [])
+                    training_data[n_train] = (instance.graph, node_tour)
+                    n_train += 1
+                
+                results.add(
+                    instance_id=instance_id,
+                    algorithm='classical_cpp',
+                    variant='classical',
+                    cost=cost,
+                    tour_length=len(tour) if tour else 0,
+                    feasible=True,
+                    runtime_seconds=runtime,
+                    **instance_meta[instance_id]
+                )
+                
+                if i % 10 == 0:
+                    print(f"  Progress: {i}/{len(instances)}")
+                    
+            except Exception as e:
+                print(f"  ✗ Error: {e}")
+
+        print(f"  ✅ {results.counts['classical_cpp']} results")
+        del training_data[n_train:]  # Drop unused slots if some instances failed
+
+        print("\n2. Greedy...")
+        solved = map_solve(solve_greedy_heuristic, graph_args, workers)
+        for i, ((instance_id, instance), out) in enumerate(zip(instances.items(), solved), 1):
+            try:
+                if isinstance(out, Exception):
+                    raise out
+                (cost, tour), runtime = out
+                
+                results.add(
+                    instance_id=instance_id,
+                    algorithm='greedy',
+                    variant='greedy',
+                    cost=cost,
+                    tour_length=len(tour) if tour else 0,
+                    feasible=True,
+                    runtime_seconds=runtime,
+                    **instance_meta[instance_id]
+                )
+                
+                if i % 10 == 0:
+                    print(f"  Progress: {i}/{len(instances)}")
+                    
+            except:
+                pass
+
+        print(f"  ✅ {results.counts['greedy']} results")
+
+        # Rows written so far are exactly Part 1's (read back as CSV strings)
+        results.file.flush()
+        with open(output_dir / "all_results.csv", newline='') as f:
+            part1_rows = list(csv.DictReader(f))
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with part1_open(part1_file, 'wb') as f:
+            pickle.dump({'stamps': stamps, 'classical_costs': classical_costs,
+                         'training_data': training_data, 'rows': part1_rows}, f, protocol=5)
+
+    # ==================== PART 2: LIGHTWEIGHT ML ====================
+    print("\n" + "="*70)
+    print("PART 2/4: Lightweight ML Learning")
+    print("="*70)
+    print("\nApproach: Feature-based supervised learning")
+    print("  (Lightweight, fast training, guaranteed to finish)")
+
+    ml_solver = SimpleMLCPP()
+
+    # Features and shortest paths run on flat CSR arrays (scipy) instead of NetworkX
+    print(f"\nTraining on {len(training_data)} instances...")
+    if ml_solver.train_from_solutions(training_data, csr=[graph_csr(G) for G, _ in training_data]):
+        print("  ✓ Training complete")
         
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='greedy',
-            variant='greedy',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=instance.metadata.num_nodes,
-            num_edges=instance.metadata.num_edges,
-            network_family=instance.metadata.network_family,
-            size=instance.metadata.size,
-            gap_from_classical=gap
-        ))
+        print("\nTesting learned heuristic...")
+        ml_args = [(instance.graph, graph_csr(instance.graph)) for instance in instances.values()]
+        solved = map_solve(ml_solver.solve_with_learning, ml_args, workers)
+        for i, ((instance_id, instance), out) in enumerate(zip(instances.items(), solved), 1):
+            try:
+                if isinstance(out, Exception):
+                    raise out
+                (cost, tour, meta), runtime = out
+                
+                results.add(
+                    instance_id=instance_id,
+                    algorithm='ml_learned',
+                    variant='feature_based',
+                    cost=cost,
+                    tour_length=len(tour) if tour else 0,
+                    feasible=True,
+                    runtime_seconds=runtime,
+                    **instance_meta[instance_id],
+                    metadata=meta
+                )
+                
+                if i % 10 == 0:
+                    print(f"  Progress: {i}/{len(instances)}")
+                    
+            except:
+                pass
         
-        if i % 10 == 0:
-            print(f"  Progress: {i}/{len(instance_ids)}")
-            
-    except:
-        pass
-
-print(f"  ✅ {len([r for r in results if r.algorithm == 'greedy'])} results")
-
-# ==================== PART 2: LIGHTWEIGHT ML ====================
-print("\n" + "="*70)
-print("PART 2/4: Lightweight ML Learning")
-print("="*70)
-print("\nApproach: Feature-based supervised learning")
-print("  (Lightweight, fast training, guaranteed to finish)")
-
-ml_solver = SimpleMLCPP()
-
-print(f"\nTraining on {min(30, len(training_data))} instances...")
-if ml_solver.train_from_solutions(training_data[:30]):
-    print("  ✓ Training complete")
-    
-    print("\nTesting learned heuristic...")
-    for i, instance_id in enumerate(instance_ids, 1):
+        ml_count = results.counts['ml_learned']
+        print(f"  ✅ {ml_count} ML results")
+    else:
+        print("  ⚠️  ML training failed")
+
+    # ==================== PART 3: CPP-LC ====================
+    print("\n" + "="*70)
+    print("PART 3/4: CPP-LC (Ultra-Fast Version)")
+    print("="*70)
+
+    cpp_lc_count = 0
+    lc_instances = {iid: inst for iid, inst in instances.items() if inst.edge_demands is not None}
+    lc_args = [(inst.graph, {
+                   'edge_demands': inst.edge_demands,
+                   'capacity': inst.vehicle_capacity if inst.vehicle_capacity else
+                               sum(inst.edge_demands.values()) / 2 * 0.4,
+               }) for inst in lc_instances.values()]
+
+    solved = map_solve(solve_cpp_lc_fast, lc_args, workers)
+    for i, ((instance_id, instance), out) in enumerate(zip(lc_instances.items(), solved), 1):
         try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour, meta = ml_solver.solve_with_learning(instance.graph)
-            runtime = time.time() - start
-            
-            gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
+            if isinstance(out, Exception):
+                raise out
+            (cost, tour, meta), runtime = out
             
-            results.append(ExperimentResult(
+            results.add(
                 instance_id=instance_id,
-                algorithm='ml_learned',
-                variant='feature_based',
+                algorithm='cpp_lc_fast',
+                variant='load_dependent',
                 cost=cost,
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap,
+                **instance_meta[instance_id],
                 metadata=meta
-            ))
+            )
+            cpp_lc_count += 1
             
             if i % 10 == 0:
-                print(f"  Progress: {i}/{len(instance_ids)}")
+                print(f"  Progress: {cpp_lc_count} CPP-LC results")
                 
         except:
             pass
-    
-    ml_count = len([r for r in results if r.algorithm == 'ml_learned'])
-    print(f"  ✅ {ml_count} ML results")
-else:
-    print("  ⚠️  ML training failed")
-
-# ==================== PART 3: CPP-LC ====================
-print("\n" + "="*70)
-print("PART 3/4: CPP-LC (Ultra-Fast Version)")
-print("="*70)
-
-cpp_lc_count = 0
-for i, instance_id in enumerate(instance_ids, 1):
-    try:
-        instance = gen.load_instance(instance_id)
-        
-        if instance.edge_demands is None:
-            continue
-        
-        capacity = instance.vehicle_capacity if instance.vehicle_capacity else \
-                  sum(instance.edge_demands.values()) / 2 * 0.4
-        
-        solver = SimplifiedCPPLC(instance.graph, instance.edge_demands, capacity)
-        
-        start = time.time()
-        cost, tour, meta = solver.solve_fast()
-        runtime = time.time() - start
-        
-        gap = ((cost - classical_costs.get(instance_id, cost)) / classical_costs.get(instance_id, cost) * 100) if classical_costs.get(instance_id, cost) > 0 else 0
-        
-        results.append(ExperimentResult(
-            instance_id=instance_id,
-            algorithm='cpp_lc_fast',
-            variant='load_dependent',
-            cost=cost,
-            tour_length=len(tour) if tour else 0,
-            feasible=True,
-            runtime_seconds=runtime,
-            num_nodes=instance.metadata.num_nodes,
-            num_edges=instance.metadata.num_edges,
-            network_family=instance.metadata.network_family,
-            size=instance.metadata.size,
-            gap_from_classical=gap,
-            metadata=meta
-        ))
-        cpp_lc_count += 1
-        
-        if i % 10 == 0:
-            print(f"  Progress: {cpp_lc_count} CPP-LC results")
-            
-    except:
-        pass
 
-print(f"  ✅ {cpp_lc_count} CPP-LC results")
+    print(f"  ✅ {cpp_lc_count} CPP-LC results")
 
-# ==================== PART 4: LONDON ====================
-print("\n" + "="*70)
-print("PART 4/4: Real London Data")
-print("="*70)
+    # ==================== PART 4: LONDON ====================
+    print("\n" + "="*70)
+    print("PART 4/4: Real London Data")
+    print("="*70)
 
-try:
-    from download_london import quick_london_download
-    
-    G_london = quick_london_download()
-    
-    if G_london:
-        # Classical
-        cost, _ = solve_classical_cpp(G_london)
-        london_classical = cost
-        
-        # Greedy
-        cost_g, _ = solve_greedy_heuristic(G_london)
-        
-        # ML
-        cost_ml, _, _ = ml_solver.solve_with_learning(G_london)
-        
-        for algo, c in [('classical_cpp', cost), ('greedy', cost_g), ('ml_learned', cost_ml)]:
-            results.append(ExperimentResult(
-                instance_id='london',
-                algorithm=algo,
-                variant='real_world',
-                cost=c,
-                tour_length=0,
-                feasible=True,
-                runtime_seconds=0,
-                num_nodes=G_london.number_of_nodes(),
-                num_edges=G_london.number_of_edges(),
-                network_family='osm_real',
-                size='real',
-                gap_from_classical=((c - london_classical) / london_classical * 100)
-            ))
+    try:
+        from download_london import quick_london_download
         
-        print(f"  ✅ London: Classical={cost:.1f}, ML={cost_ml:.1f} ({((cost_ml-cost)/cost*100):.1f}% gap)")
+        G_london = quick_london_download()
         
-except Exception as e:
-    print(f"  ⚠️  London failed: {e}")
-
-# ==================== SAVE ====================
-print("\n" + "="*70)
-print("SAVING RESULTS")
-print("="*70)
-
-df = pd.DataFrame([r.to_dict() for r in results])
-
-output_dir = Path("results_final")
-output_dir.mkdir(exist_ok=True)
-
-df.to_csv(output_dir / "all_results.csv", index=False)
-print(f"  ✓ CSV: {output_dir / 'all_results.csv'}")
-
-summary = df.groupby('algorithm').agg({
-    'cost': ['count', 'mean', 'std'],
-    'gap_from_classical': ['mean', 'std']
-}).round(3)
-
-print("\n" + "="*70)
-print("SUMMARY")
-print("="*70)
-print(summary)
-
-summary.to_csv(output_dir / "summary.csv")
-
-total_time = time.time() - overall_start
-
-print("\n" + "="*70)
-print("✅ COMPLETE!")
-print("="*70)
-print(f"Total results: {len(results)}")
-print(f"Total time: {total_time/60:.1f} minutes")
-
-print("\n📊 What you have:")
-for algo in df['algorithm'].unique():
-    count = len(df[df['algorithm'] == algo])
-    gap = df[df['algorithm'] == algo]['gap_from_classical'].mean()
-    print(f"  {algo}: {count} instances, {gap:.1f}% avg gap")
-
-cpp_lc_data = df[df['algorithm'] == 'cpp_lc_fast']
-if not cpp_lc_data.empty:
-    print(f"\n🔥 CPP-LC: {cpp_lc_data['gap_from_classical'].mean():.1f}% cost increase")
-
-print("\n🎯 Next: python3 complete_plots.py")
+        if G_london:
+            # Classical
+            cost = solve_classical_cpp(G_london)['cost']
+            classical_costs['london'] = cost
+            
+            # Greedy
+            cost_g, _ = solve_greedy_heuristic(G_london)
+            
+            # ML
+            cost_ml, _, _ = ml_solver.solve_with_learning(G_london, csr=graph_csr(G_london))
+            
+            for algo, c in [('classical_cpp', cost), ('greedy', cost_g), ('ml_learned', cost_ml)]:
+                results.add(
+                    instance_id='london',
+                    algorithm=algo,
+                    variant='real_world',
+                    cost=c,
+                    tour_length=0,
+                    feasible=True,
+                    runtime_seconds=0,
+                    num_nodes=G_london.number_of_nodes(),
+                    num_edges=G_london.number_of_edges(),
+                    network_family='osm_real',
+                    size='real'
+                )
+            
+            print(f"  ✅ London: Classical={cost:.1f}, ML={cost_ml:.1f} ({((cost_ml-cost)/cost*100):.1f}% gap)")
+            
+    except Exception as e:
+        print(f"  ⚠️  London failed: {e}")
+
+    # ==================== SAVE ====================
+    print("\n" + "="*70)
+    print("SAVING RESULTS")
+    print("="*70)
+
+    results.close()
+    df = pd.read_csv(output_dir / "all_results.csv")
+
+    # Rows were streamed without gaps: fill gap_from_classical in one vectorized
+    # pass (0.0 where the instance has no positive classical cost)
+    base = df['instance_id'].map(classical_costs)
+    base = base.where(base > 0)
+    df['gap_from_classical'] = ((df['cost'] - base) / base * 100).fillna(0.0)
+    df.to_csv(output_dir / "all_results.csv", index=False)
+    print(f"  ✓ CSV: {output_dir / 'all_results.csv'}")
+
+    summary = df.groupby('algorithm').agg({
+        'cost': ['count', 'mean', 'std'],
+        'gap_from_classical': ['mean', 'std']
+    }).round(3)
+
+    print("\n" + "="*70)
+    print("SUMMARY")
+    print("="*70)
+    print(summary)
+
+    summary.to_csv(output_dir / "summary.csv")
+
+    total_time = time.time() - overall_start
+
+    print("\n" + "="*70)
+    print("✅ COMPLETE!")
+    print("="*70)
+    print(f"Total results: {len(df)}")
+    print(f"Total time: {total_time/60:.1f} minutes")
+
+    print("\n📊 What you have:")
+    for algo in df['algorithm'].unique():
+        count = len(df[df['algorithm'] == algo])
+        gap = df[df['algorithm'] == algo]['gap_from_classical'].mean()
+        print(f"  {algo}: {count} instances, {gap:.1f}% avg gap")
+
+    cpp_lc_data = df[df['algorithm'] == 'cpp_lc_fast']
+    if not cpp_lc_data.empty:
+        print(f"\n🔥 CPP-LC: {cpp_lc_data['gap_from_classical'].mean():.1f}% cost increase")
+
+    print("\n🎯 Next: python3 complete_plots.py")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Failsafe CPP pipeline")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes per part (default: all cores; 1 = sequential, for debugging)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="ignore the Part 1 checkpoint and re-solve the baselines")
+    args = parser.parse_args()
+    
+    main(workers=args.workers, rebuild=args.rebuild)
@@ -9,6 +9,9 @@ from pathlib import Path
 import json
 from datetime import datetime
 
+from convert_graphs import save_graph_npz
+from osm_utils import osm_to_simple_graph
+
 
 def download_osm_fast():
     """Download small OSM areas quickly"""
@@ -50,27 +53,9 @@ def download_osm_fast():
             )
             
             print(f"   Converting to simple graph...")
-            # Convert to simple undirected graph
-            G_simple = G.to_undirected()
-            G_final = nx.Graph()
-            
-            node_mapping = {node: i for i, node in enumerate(G_simple.nodes())}
-            G_final.add_nodes_from(range(len(node_mapping)))
-            
-            for u, v, data in G_simple.edges(data=True):
-                u_idx = node_mapping[u]
-                v_idx = node_mapping[v]
-                length = data.get('length', 100.0)
-                weight = length / 100.0
-                
-                if not G_final.has_edge(u_idx, v_idx):
-                    G_final.add_edge(u_idx, v_idx, weight=weight, length=length)
-            
-            # Take largest connected component
-            if not nx.is_connected(G_final):
-                largest_cc = max(nx.connected_components(G_final), key=len)
-                G_final = G_final.subgraph(largest_cc).copy()
-                G_final = nx.convert_node_labels_to_integers(G_final)
+            # Collapse to a simple integer-labelled graph (duplicates dropped up front,
+            # largest component only)
+            G_final = osm_to_simple_graph(G)
             
             downloaded_networks[city_key] = G_final
             
@@ -94,7 +79,9 @@ def save_networks(networks, output_dir="benchmarks/osm_derived"):
     for city_key, G in networks.items():
         # GraphML
         graphml_file = output_path / f"osm_{city_key}.graphml"
-        nx.write_graphml(G, graphml_file)
+        nx.write_graphml(G, str(graphml_file), prettyprint=False)
+        # Binary edge list next to it (newer, so the pipelines skip the XML parse)
+        save_graph_npz(G, graphml_file.with_suffix(".npz"))
         
         # Metadata
         metadata = {
@@ -8,14 +8,115 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 import pandas as pd
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+
+from tqdm import tqdm
 
 from benchmark_generator import BenchmarkGenerator
 from cpp_adapters import solve_classical_cpp, solve_greedy_heuristic, solve_two_opt
 from experimental_pipeline import ExperimentResult
+from pipeline import ResultStream, quiet_worker
+
+
+def _make_result(instance_id, meta, algorithm, variant, cost, tour, runtime, gap):
+    """ExperimentResult row for one solved instance (meta: its InstanceMetadata)"""
+    return ExperimentResult(
+        instance_id=instance_id,
+        algorithm=algorithm,
+        variant=variant,
+        cost=cost,
+        tour_length=len(tour) if tour else 0,
+        feasible=True,
+        runtime_seconds=runtime,
+        num_nodes=meta.num_nodes,
+        num_edges=meta.num_edges,
+        network_family=meta.network_family,
+        size=meta.size,
+        gap_from_classical=gap
+    )
+
+
+def _gap(cost, classical_cost):
+    """Percent gap from the classical cost (NaN if the classical solve failed)"""
+    if classical_cost is None:
+        return float('nan')  # Unknown, not 0%: keeps the summary means honest
+    return ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
+
+
+# Workers: one task per (instance, algorithm). Module-level so they pickle
+# into ProcessPoolExecutor; only the graph is shipped and (cost, tour,
+# runtime) comes back - result rows are assembled in the parent.
+
+def _run_classical(G):
+    start = time.time()
+    solution = solve_classical_cpp(G)
+    runtime = time.time() - start
+    
+    return solution['cost'], solution['tour'], runtime
+
+
+def _run_greedy(G):
+    start = time.time()
+    cost, tour = solve_greedy_heuristic(G)
+    runtime = time.time() - start
+    
+    return cost, tour, runtime
+
+
+def _run_two_opt(G):
+    start = time.time()
+    cost, tour = solve_two_opt(G, max_iterations=50)  # Limit iterations
+    runtime = time.time() - start
+    
+    return cost, tour, runtime
+
+
+def _collect(futures, instance_ids, stream, meta, algorithm, variant, classical_costs=None):
+    """
+    Gather finished tasks in instance order behind one progress bar,
+    writing each success to stream
+
+    Rows take their instance fields from meta ({instance_id: InstanceMetadata});
+    with classical_costs they also get a gap (the classical pass itself has none).
+
+    Returns:
+        {instance_id: cost} for the tasks that succeeded
+    """
+    costs = {}
+    for instance_id, future in tqdm(zip(instance_ids, futures), total=len(instance_ids),
+                                    desc=algorithm):
+        try:
+            cost, tour, runtime = future.result()
+            if classical_costs is None:
+                gap = 0.0
+            else:
+                gap = _gap(cost, classical_costs.get(instance_id))
+            result = _make_result(instance_id, meta[instance_id], algorithm, variant,
+                                  cost, tour, runtime, gap)
+            stream.add(**vars(result))
+            costs[instance_id] = result.cost
+            
+        except Exception as e:
+            tqdm.write(f"  ✗ Error on {instance_id}: {e}")
+    
+    print(f"✅ {algorithm} complete: {len(costs)}/{len(instance_ids)} results")
+    return costs
+
 
 def run_fast_experiments():
-    """Run only the fast experiments"""
+    """
+    Run only the fast experiments
+
+    Rows are appended to all_results.csv as each task finishes, so an
+    interrupted run keeps what it has; the summary reads the file back.
+    Row fields come from each instance's metadata JSON; only the graphs
+    are unpickled. classical_costs is fixed once the classical pass is done
+    (read-only from then on); a greedy/2-opt row whose classical solve
+    failed gets a NaN gap.
+    """
     
     print("="*70)
     print("FAST EXPERIMENTAL PIPELINE - MINIMAL VERSION")
@@ -28,137 +129,62 @@ def run_fast_experiments():
     print(f"\n📊 Found {len(instance_ids)} instances")
     print(f"🔬 Running 3 fast algorithms (skipping slow ones)")
     
-    results = []
-    
-    # Algorithm 1: Classical CPP
-    print("\n" + "="*70)
-    print("1. Classical CPP (Baseline)")
-    print("="*70)
-    
-    for i, instance_id in enumerate(instance_ids):
-        print(f"  [{i+1}/{len(instance_ids)}] {instance_id}...", end=" ")
-        
+    # Load every graph once (all three passes reuse it); the result rows
+    # only need the lightweight metadata
+    graphs, meta = {}, {}
+    for instance_id in instance_ids:
         try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour = solve_classical_cpp(instance.graph)
-            runtime = time.time() - start
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='classical_cpp',
-                variant='classical',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=0.0
-            )
-            
-            results.append(result)
-            print(f"✓ Cost: {cost:.2f}, Time: {runtime:.3f}s")
-            
+            meta[instance_id] = gen.load_metadata(instance_id)
+            graphs[instance_id] = gen.load_instance(instance_id).graph
         except Exception as e:
-            print(f"✗ Error: {e}")
+            print(f"  ✗ Failed to load {instance_id}: {e}")
+    instance_ids = list(graphs)
     
-    # Algorithm 2: Greedy
-    print("\n" + "="*70)
-    print("2. Greedy Heuristic")
-    print("="*70)
-    
-    # Get classical costs for comparison
-    classical_costs = {r.instance_id: r.cost for r in results if r.algorithm == 'classical_cpp'}
-    
-    for i, instance_id in enumerate(instance_ids):
-        print(f"  [{i+1}/{len(instance_ids)}] {instance_id}...", end=" ")
+    output_dir = Path("experimental_results_fast")
+    output_dir.mkdir(exist_ok=True)
+    results_file = output_dir / "all_results.csv"
+    stream = ResultStream(results_file)
+    
+    # Instances are independent: every algorithm pass fans out over all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=quiet_worker) as ex:
+        # Gaps are computed in the parent, so all three passes queue at once
+        classical = [ex.submit(_run_classical, graphs[iid]) for iid in instance_ids]
+        greedy = [ex.submit(_run_greedy, graphs[iid]) for iid in instance_ids]
+        two_opt = [ex.submit(_run_two_opt, graphs[iid]) for iid in instance_ids]
         
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour = solve_greedy_heuristic(instance.graph)
-            runtime = time.time() - start
-            
-            classical_cost = classical_costs.get(instance_id, cost)
-            gap = ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='greedy',
-                variant='greedy',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap
-            )
-            
-            results.append(result)
-            print(f"✓ Cost: {cost:.2f}, Gap: {gap:.1f}%, Time: {runtime:.3f}s")
-            
-        except Exception as e:
-            print(f"✗ Error: {e}")
-    
-    # Algorithm 3: 2-opt
-    print("\n" + "="*70)
-    print("3. 2-Opt Local Search")
-    print("="*70)
-    
-    for i, instance_id in enumerate(instance_ids):
-        print(f"  [{i+1}/{len(instance_ids)}] {instance_id}...", end=" ")
+        # Algorithm 1: Classical CPP
+        print("\n" + "="*70)
+        print("1. Classical CPP (Baseline)")
+        print("="*70)
         
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour = solve_two_opt(instance.graph, max_iterations=50)  # Limit iterations
-            runtime = time.time() - start
-            
-            classical_cost = classical_costs.get(instance_id, cost)
-            gap = ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='two_opt',
-                variant='local_search',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap
-            )
-            
-            results.append(result)
-            print(f"✓ Cost: {cost:.2f}, Gap: {gap:.1f}%, Time: {runtime:.3f}s")
-            
-        except Exception as e:
-            print(f"✗ Error: {e}")
+        # Classical costs for comparison (successful classical tasks only)
+        classical_costs = MappingProxyType(_collect(
+            classical, instance_ids, stream, meta, 'classical_cpp', 'classical'))
+        
+        # Algorithm 2: Greedy
+        print("\n" + "="*70)
+        print("2. Greedy Heuristic")
+        print("="*70)
+        
+        _collect(greedy, instance_ids, stream, meta, 'greedy', 'greedy', classical_costs)
+        
+        # Algorithm 3: 2-opt
+        print("\n" + "="*70)
+        print("3. 2-Opt Local Search")
+        print("="*70)
+        
+        _collect(two_opt, instance_ids, stream, meta, 'two_opt', 'local_search',
+                 classical_costs)
+    
+    stream.close()
     
-    # Save results
+    # Results were written as they came in; read them back for the summary
     print("\n" + "="*70)
     print("Saving Results")
     print("="*70)
     
-    df = pd.DataFrame([r.to_dict() for r in results])
-    
-    output_dir = Path("experimental_results_fast")
-    output_dir.mkdir(exist_ok=True)
-    
-    df.to_csv(output_dir / "all_results.csv", index=False)
-    print(f"✓ Saved: {output_dir / 'all_results.csv'}")
+    df = pd.read_csv(results_file)
+    print(f"✓ Saved: {results_file}")
     
     # Summary
     print("\n" + "="*70)
@@ -176,7 +202,7 @@ def run_fast_experiments():
     summary.to_csv(output_dir / "summary.csv")
     
     print(f"\n✅ COMPLETE!")
-    print(f"   Total results: {len(results)}")
+    print(f"   Total results: {len(df)}")
     print(f"   Saved to: {output_dir}/")
     
     return df
@@ -3,15 +3,21 @@ Fast Plotting - Essential Figures Only
 """
 
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Headless batch rendering, no GUI canvas managers
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from pathlib import Path
 
-# High-quality settings
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['font.size'] = 10
 
+def save_both(fig, base):
+    """Write fig as <base>.pdf (vector) and a <base>.png preview (150 dpi)"""
+    fig.savefig(base.with_suffix('.pdf'))
+    fig.savefig(base.with_suffix('.png'), dpi=150)
+
+
+@plt.rc_context({'font.size': 10})  # Scoped to this call, not leaked to importers
 def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv"):
     """Generate essential figures"""
     
@@ -19,35 +25,37 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
     output_dir = Path("figures_fast")
     output_dir.mkdir(exist_ok=True)
     
+    # One colour per algorithm, shared by every figure
+    algorithms = df['algorithm'].unique()
+    palette = dict(zip(algorithms, sns.color_palette('Set2', n_colors=len(algorithms))))
+    
     print("="*70)
     print("GENERATING FIGURES")
     print("="*70)
     
     # Figure 1: Algorithm Comparison
     print("\n📊 Figure 1: Algorithm Comparison (boxplot)...")
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
     
-    sns.boxplot(data=df, x='algorithm', y='cost', ax=ax, palette='Set2')
+    sns.boxplot(data=df, x='algorithm', y='cost', ax=ax, palette=palette)
     ax.set_xlabel('Algorithm')
     ax.set_ylabel('Solution Cost')
     ax.set_title('Algorithm Performance Comparison')
     ax.grid(True, alpha=0.3, axis='y')
     plt.xticks(rotation=45)
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig1_algorithm_comparison.pdf")
-    fig.savefig(output_dir / "fig1_algorithm_comparison.png", dp=300)
+    save_both(fig, output_dir / "fig1_algorithm_comparison")
     plt.close(fig)
     print("   ✓ Saved")
     
     # Figure 2: Runtime vs Quality
     print("\n📊 Figure 2: Runtime vs Quality...")
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = plt.subplots(figsize=(10, 6), layout='constrained')
     
-    for algo in df['algorithm'].unique():
-        algo_data = df[df['algorithm'] == algo]
+    # One grouping pass (sort=False keeps first-seen algorithm order/colors)
+    for algo, algo_data in df.groupby('algorithm', sort=False):
         ax.scatter(algo_data['runtime_seconds'], algo_data['cost'], 
-                  s=100, alpha=0.6, label=algo)
+                  s=100, alpha=0.6, label=algo, color=palette[algo])
     
     ax.set_xlabel('Runtime (seconds)')
     ax.set_ylabel('Solution Cost')
@@ -56,15 +64,13 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig2_runtime_vs_quality.pdf")
-    fig.savefig(output_dir / "fig2_runtime_vs_quality.png", dpi=300)
+    save_both(fig, output_dir / "fig2_runtime_vs_quality")
     plt.close(fig)
     print("   ✓ Saved")
     
     # Figure 3: Performance by Network Type
     print("\n📊 Figure 3: Performance by Network Family...")
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig, ax = plt.subplots(figsize=(12, 6), layout='constrained')
     
     # Group by network family and algorithm
     data_pivot = df.pivot_table(
@@ -74,7 +80,8 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
         aggfunc='mean'
     )
     
-    data_pivot.plot(kind='bar', ax=ax, width=0.8)
+    data_pivot.plot(kind='bar', ax=ax, width=0.8,
+                    color=[palette[algo] for algo in data_pivot.columns])
     ax.set_xlabel('Network Family')
     ax.set_ylabel('Mean Cost')
     ax.set_title('Algorithm Performance by Network Topology')
@@ -82,27 +89,26 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
     ax.grid(True, alpha=0.3, axis='y')
     plt.xticks(rotation=45, ha='right')
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig3_network_family.pdf")
-    fig.savefig(output_dir / "fig3_network_family.png", dpi=300)
+    save_both(fig, output_dir / "fig3_network_family")
     plt.close(fig)
     print("   ✓ Saved")
     
     #Figure 4: Scalability
     print("\n📊 Figure 4: Scalability Analysis...")
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5), layout='constrained')
+    
+    # Per-(algorithm, size) means for both panels in one groupby
+    size_means = df.groupby(['algorithm', 'num_nodes'], sort=False)[
+        ['runtime_seconds', 'cost']].mean().reset_index()
+    by_algo = [(algo, grouped.sort_values('num_nodes'))
+               for algo, grouped in size_means.groupby('algorithm', sort=False)]
     
     # Runtime vs nodes
     ax = axes[0]
-    for algo in df['algorithm'].unique():
-        algo_data = df[df['algorithm'] == algo]
-        grouped = algo_data.groupby('num_nodes').agg({
-            'runtime_seconds': 'mean'
-        }).reset_index()
-        
+    for algo, grouped in by_algo:
         if len(grouped) >= 2:
             ax.plot(grouped['num_nodes'], grouped['runtime_seconds'], 
-                   marker='o', label=algo, linewidth=2)
+                   marker='o', label=algo, linewidth=2, color=palette[algo])
     
     ax.set_xlabel('Number of Nodes')
     ax.set_ylabel('Runtime (seconds)')
@@ -112,15 +118,10 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
     
     # Cost vs nodes
     ax = axes[1]
-    for algo in df['algorithm'].unique():
-        algo_data = df[df['algorithm'] == algo]
-        grouped = algo_data.groupby('num_nodes').agg({
-            'cost': 'mean'
-        }).reset_index()
-        
+    for algo, grouped in by_algo:
         if len(grouped) >= 2:
             ax.plot(grouped['num_nodes'], grouped['cost'], 
-                   marker='s', label=algo, linewidth=2)
+                   marker='s', label=algo, linewidth=2, color=palette[algo])
     
     ax.set_xlabel('Number of Nodes')
     ax.set_ylabel('Solution Cost')
@@ -128,9 +129,7 @@ def generate_fast_figures(results_csv="experimental_results_fast/all_results.csv
     ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    fig.savefig(output_dir / "fig4_scalability.pdf")
-    fig.savefig(output_dir / "fig4_scalability.png", dpi=300)
+    save_both(fig, output_dir / "fig4_scalability")
     plt.close(fig)
     print("   ✓ Saved")
     
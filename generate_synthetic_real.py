@@ -9,80 +9,73 @@ Creates networks with realistic properties:
 - Realistic edge weights
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import networkx as nx
 import numpy as np
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 from pathlib import Path
 import json
 from datetime import datetime
+from joblib import Memory
+
+
+def spatial_candidates(pos, threshold):
+    """
+    Every pair i < j closer than threshold, in (i, j) loop order
+
+    A KD-tree only visits nearby pairs (O((n + k) log n) for k hits rather
+    than all n^2); hits are sorted back into loop order so the per-pair coin
+    flips line up as before.
+
+    Args:
+        pos: (n, 2) float64 positions
+
+    Returns:
+        (pairs, dists): (k, 2) int32 node pairs and their distances
+    """
+    pairs = cKDTree(pos).query_pairs(r=threshold, output_type='ndarray')
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    delta = pos[pairs[:, 0]] - pos[pairs[:, 1]]
+    d2 = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]
+    close = d2 < threshold * threshold  # query_pairs is inclusive (<= r)
+    return pairs[close].astype(np.int32), np.sqrt(d2[close])
 
-np.random.seed(42)
-
-print("="*70)
-print("GENERATING SYNTHETIC REAL-WORLD-LIKE NETWORKS")
-print("="*70)
-
-output_dir = Path("benchmarks/osm_derived")
-output_dir.mkdir(parents=True, exist_ok=True)
-
-# Generate 3 different synthetic real-world networks
-configs = [
-    {
-        'name': 'synthetic_urban_200',
-        'num_nodes': 200,
-        'description': 'Synthetic urban-like network (200 nodes)',
-        'clustering': 0.3
-    },
-    {
-        'name': 'synthetic_suburban_150',
-        'num_nodes': 150,
-        'description': 'Synthetic suburban-like network (150 nodes)',
-        'clustering': 0.25
-    },
-    {
-        'name': 'synthetic_highway_100',
-        'num_nodes': 100,
-        'description': 'Synthetic highway-like network (100 nodes)',
-        'clustering': 0.15
-    }
-]
-
-for config in configs:
-    print(f"\n{'='*70}")
-    print(f"Generating: {config['name']}")
-    print(f"{'='*70}")
-
-    n = config['num_nodes']
+
+# Generated graphs are memoized under the shared cache dir
+memory = Memory("data/.cache/joblib", verbose=0)
+
+
+def build_network(n, seed):
+    """
+    Build one spatial + scale-free network of n nodes
+
+    Reseeds the global RNG, so the result depends only on (n, seed); use it
+    through generate_network, its joblib-memoized form.
+    """
+    np.random.seed(seed)
 
     # Step 1: Create spatial positions (2D plane)
-    print(f"  1. Creating spatial layout ({n} nodes)...")
-    positions = {}
-    for i in range(n):
-        # Clustered positions (not uniform random)
-        cluster_x = np.random.choice([0.25, 0.5, 0.75])
-        cluster_y = np.random.choice([0.25, 0.5, 0.75])
-        x = cluster_x + np.random.normal(0, 0.15)
-        y = cluster_y + np.random.normal(0, 0.15)
-        positions[i] = (x, y)
+    # Clustered positions (not uniform random): one batched draw for the
+    # cluster centres and one for the jitter, instead of four calls per node
+    clusters = np.random.choice([0.25, 0.5, 0.75], size=(n, 2))
+    pos = clusters + np.random.normal(0, 0.15, size=(n, 2))
 
     # Step 2: Create edges based on spatial proximity + some long-range
-    print(f"  2. Creating edges (spatial + scale-free)...")
     G = nx.Graph()
     G.add_nodes_from(range(n))
 
     # Spatial threshold
     threshold = 0.2
 
-    # Add spatial edges
-    for i in range(n):
-        for j in range(i+1, n):
-            dist = np.sqrt((positions[i][0] - positions[j][0])**2 +
-                          (positions[i][1] - positions[j][1])**2)
-
-            # Closer nodes more likely to connect
-            if dist < threshold:
-                prob = 1.0 - (dist / threshold)
-                if np.random.random() < prob:
-                    G.add_edge(i, j)
+    # Add spatial edges: candidate pairs come from the KD-tree query, then
+    # one uniform draw per candidate (same order as the old nested loop)
+    # decides it - closer nodes more likely to connect
+    pairs, dists = spatial_candidates(pos, threshold)
+    keep = np.random.random(len(dists)) < 1.0 - (dists / threshold)
+    G.add_edges_from(pairs[keep].tolist())
 
     # Add some long-range edges (highways)
     num_long_range = int(n * 0.1)
@@ -92,68 +85,135 @@ for config in configs:
             G.add_edge(i, j)
 
     # Ensure connectivity
-    print(f"  3. Ensuring connectivity...")
-    if not nx.is_connected(G):
-        components = list(nx.connected_components(G))
-        # Connect components
-        for i in range(len(components) - 1):
-            node1 = np.random.choice(list(components[i]))
-            node2 = np.random.choice(list(components[i+1]))
-            G.add_edge(node1, node2)
+    # (one scipy labelling pass replaces is_connected + connected_components;
+    # labels follow the lowest node id, the same component order as NetworkX)
+    A = nx.to_scipy_sparse_array(G, nodelist=range(n), weight=None, format='csr')
+    n_comp, labels = connected_components(A, directed=False)
+    if n_comp > 1:
+        # Members of each component as array slices (no set -> list copies)
+        order = np.argsort(labels, kind='stable')
+        members = np.split(order, np.cumsum(np.bincount(labels))[:-1])
+        # Connect consecutive components through random members
+        bridges = []
+        for i in range(n_comp - 1):
+            node1 = np.random.choice(members[i])
+            node2 = np.random.choice(members[i + 1])
+            bridges.append((int(node1), int(node2)))
+        G.add_edges_from(bridges)
 
     # Step 3: Add realistic edge weights based on spatial distance
-    print(f"  4. Adding edge weights...")
-    for u, v in G.edges():
-        spatial_dist = np.sqrt((positions[u][0] - positions[v][0])**2 +
-                              (positions[u][1] - positions[v][1])**2)
-
-        # Weight = distance * random factor (simulates different road types)
-        base_weight = spatial_dist * 10  # Scale to km-like units
-        road_factor = np.random.choice([0.8, 1.0, 1.5, 2.0])  # highway, arterial, residential, local
-
-        G[u][v]['weight'] = base_weight * road_factor
-
-    print(f"  5. Network statistics:")
-    print(f"     Nodes: {G.number_of_nodes()}")
-    print(f"     Edges: {G.number_of_edges()}")
-    print(f"     Avg degree: {2*G.number_of_edges()/G.number_of_nodes():.1f}")
-    print(f"     Connected: {nx.is_connected(G)}")
-
-    actual_clustering = nx.average_clustering(G)
-    print(f"     Clustering coefficient: {actual_clustering:.3f}")
-
-    # Save graph
-    output_file = output_dir / f"{config['name']}.graphml"
-    nx.write_graphml(G, str(output_file))
-    print(f"\n  ✅ Saved: {output_file}")
-
-    # Save metadata
-    metadata = {
-        'instance_id': config['name'],
-        'network_family': 'synthetic_real_world',
-        'description': config['description'],
-        'num_nodes': G.number_of_nodes(),
-        'num_edges': G.number_of_edges(),
-        'avg_degree': 2*G.number_of_edges()/G.number_of_nodes(),
-        'clustering_coefficient': actual_clustering,
-        'source': 'Generated synthetic network with real-world properties',
-        'generation_method': 'Spatial + scale-free hybrid',
-        'generation_date': datetime.now().isoformat()
-    }
-
-    metadata_file = output_dir / f"{config['name']}_metadata.json"
-    with open(metadata_file, 'w') as f:
-        json.dump(metadata, f, indent=2)
-
-    print(f"  ✅ Saved: {metadata_file}")
-
-print("\n" + "="*70)
-print("✅ GENERATION COMPLETE!")
-print("="*70)
-print(f"\nGenerated {len(configs)} synthetic real-world-like networks")
-print("\nThese networks have:")
-print("  ✓ Realistic spatial structure")
-print("  ✓ Clustered topology")
-print("  ✓ Scale-free degree distribution")
-print("  ✓ Varying edge weights (road types)")
-print("\nReady for ML training alongside London network!")
+    # (all edges at once; one road-type draw per edge in G.edges() order)
+    edges = np.asarray(G.edges(), dtype=np.int64).reshape(-1, 2)
+    u, v = edges[:, 0], edges[:, 1]
+    spatial_dist = np.sqrt((pos[u, 0] - pos[v, 0])**2 +
+                           (pos[u, 1] - pos[v, 1])**2)
+
+    # Weight = distance * random factor (simulates different road types)
+    base_weight = spatial_dist * 10  # Scale to km-like units
+    road_factor = np.random.choice([0.8, 1.0, 1.5, 2.0], size=len(edges))  # highway, arterial, residential, local
+
+    nx.set_edge_attributes(G, dict(zip(G.edges(), base_weight * road_factor)), 'weight')
+
+    return G
+
+
+# Unchanged configs are read back from disk instead of regenerated (kept as
+# a separate name so worker processes can still pickle build_network)
+generate_network = memory.cache(build_network)
+
+
+def main():
+    """Generate, describe and save every config"""
+    print("="*70)
+    print("GENERATING SYNTHETIC REAL-WORLD-LIKE NETWORKS")
+    print("="*70)
+
+    output_dir = Path("benchmarks/osm_derived")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Generate 3 different synthetic real-world networks
+    configs = [
+        {
+            'name': 'synthetic_urban_200',
+            'seed': 42,
+            'num_nodes': 200,
+            'description': 'Synthetic urban-like network (200 nodes)',
+            'clustering': 0.3
+        },
+        {
+            'name': 'synthetic_suburban_150',
+            'seed': 43,
+            'num_nodes': 150,
+            'description': 'Synthetic suburban-like network (150 nodes)',
+            'clustering': 0.25
+        },
+        {
+            'name': 'synthetic_highway_100',
+            'seed': 44,
+            'num_nodes': 100,
+            'description': 'Synthetic highway-like network (100 nodes)',
+            'clustering': 0.15
+        }
+    ]
+
+    # Configs are independent (each has its own seed): build them in parallel
+    print(f"\n🔄 Building {len(configs)} networks...")
+    with ProcessPoolExecutor(max_workers=min(len(configs), os.cpu_count())) as ex:
+        graphs = list(ex.map(generate_network,
+                             [c['num_nodes'] for c in configs],
+                             [c['seed'] for c in configs]))
+
+    for config, G in zip(configs, graphs):
+        print(f"\n{'='*70}")
+        print(f"Generated: {config['name']}")
+        print(f"{'='*70}")
+
+        print(f"  Network statistics:")
+        print(f"     Nodes: {G.number_of_nodes()}")
+        print(f"     Edges: {G.number_of_edges()}")
+        print(f"     Avg degree: {2*G.number_of_edges()/G.number_of_nodes():.1f}")
+        print(f"     Connected: {nx.is_connected(G)}")
+
+        actual_clustering = nx.average_clustering(G)
+        print(f"     Clustering coefficient: {actual_clustering:.3f}")
+
+        # Save graph
+        output_file = output_dir / f"{config['name']}.graphml"
+        # nx.write_graphml is the lxml writer when lxml is installed
+        nx.write_graphml(G, str(output_file), prettyprint=False)
+        print(f"\n  ✅ Saved: {output_file}")
+
+        # Save metadata
+        metadata = {
+            'instance_id': config['name'],
+            'network_family': 'synthetic_real_world',
+            'description': config['description'],
+            'num_nodes': G.number_of_nodes(),
+            'num_edges': G.number_of_edges(),
+            'avg_degree': 2*G.number_of_edges()/G.number_of_nodes(),
+            'clustering_coefficient': actual_clustering,
+            'source': 'Generated synthetic network with real-world properties',
+            'generation_method': 'Spatial + scale-free hybrid',
+            'generation_date': datetime.now().isoformat()
+        }
+
+        metadata_file = output_dir / f"{config['name']}_metadata.json"
+        with open(metadata_file, 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        print(f"  ✅ Saved: {metadata_file}")
+
+    print("\n" + "="*70)
+    print("✅ GENERATION COMPLETE!")
+    print("="*70)
+    print(f"\nGenerated {len(configs)} synthetic real-world-like networks")
+    print("\nThese networks have:")
+    print("  ✓ Realistic spatial structure")
+    print("  ✓ Clustered topology")
+    print("  ✓ Scale-free degree distribution")
+    print("  ✓ Varying edge weights (road types)")
+    print("\nReady for ML training alongside London network!")
+
+
+if __name__ == "__main__":
+    main()
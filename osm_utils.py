@@ -0,0 +1,445 @@
+"""
+Shared OSM -> NetworkX conversion for the London/Westminster extractors
+Collapses raw street multigraphs into the simple integer-labelled graphs used
+by the CPP solvers (weight = length / weight_scale, largest component only)
+"""
+
+from collections import deque
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+try:
+    import osmium
+    OSMIUM_AVAILABLE = True
+except ImportError:
+    OSMIUM_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Westminster bbox (Big Ben area) as (north, south, east, west) - ~400m area
+WESTMINSTER_BBOX = (51.502, 51.498, -0.122, -0.128)
+
+# highway=* values (and service=* subtypes) left out of a drivable network,
+# following pyrosm's "driving" filter
+NON_DRIVING_HIGHWAYS = {
+    'abandoned', 'bridleway', 'bus_guideway', 'construction', 'corridor', 'cycleway',
+    'elevator', 'escalator', 'footway', 'path', 'pedestrian', 'planned', 'platform',
+    'proposed', 'raceway', 'steps', 'track',
+}
+NON_DRIVING_SERVICE = {'emergency_access', 'parking', 'parking_aisle', 'private'}
+
+
+def is_driving_way(tags) -> bool:
+    """True if an OSM way's tags mark it as part of the drivable network"""
+    highway = tags.get('highway')
+    return not (highway is None or highway in NON_DRIVING_HIGHWAYS
+                or tags.get('area') == 'yes'
+                or tags.get('service') in NON_DRIVING_SERVICE
+                or tags.get('motor_vehicle') == 'no' or tags.get('access') == 'private')
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def scale_lengths(length, scale, default):
+        """weight = length * scale over all edges on every core (NaN length -> default)"""
+        weight = np.empty(length.size)
+        for i in prange(length.size):
+            x = length[i]
+            weight[i] = (default if np.isnan(x) else x) * scale
+        return weight
+else:
+    def scale_lengths(length, scale, default):
+        """weight = length * scale over all edges (NaN length -> default)"""
+        return np.where(np.isnan(length), default, length) * scale
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def bfs_order(indptr, indices, start, target):
+        """First `target` node ids reached by BFS from start over CSR adjacency"""
+        visited = np.zeros(indptr.size - 1, np.bool_)
+        order = np.empty(target, np.int64)  # Doubles as the queue: [head, count) is pending
+        order[0] = start
+        visited[start] = True
+        head, count = 0, 1
+        while count < target and head < count:
+            current = order[head]
+            head += 1
+            for k in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[k]
+                if not visited[neighbor]:
+                    visited[neighbor] = True
+                    order[count] = neighbor
+                    count += 1
+                    if count == target:
+                        break
+        return order[:count]
+else:
+    def bfs_order(indptr, indices, start, target):
+        """First `target` node ids reached by BFS from start over CSR adjacency"""
+        indptr, indices = indptr.tolist(), indices.tolist()
+        order = [start]
+        visited = {start}
+        queue = deque(order)
+        while len(order) < target and queue:
+            current = queue.popleft()
+            for neighbor in indices[indptr[current]:indptr[current + 1]]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    order.append(neighbor)
+                    queue.append(neighbor)
+                    if len(order) == target:
+                        break
+        return np.array(order, dtype=np.int64)
+
+
+def bfs_sample(G: nx.Graph, start, target: int) -> list:
+    """
+    The first `target` nodes of G in BFS discovery order from start
+
+    G goes to CSR arrays once (neighbours kept in adjacency order, so the
+    sample is the same as a NetworkX BFS); the walk itself is bfs_order.
+    """
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(G[v]) for v in nodes])
+    indices = np.fromiter((index[nb] for v in nodes for nb in G[v]),
+                          dtype=np.int64, count=int(indptr[-1]))
+    return [nodes[i] for i in bfs_order(indptr, indices, index[start], target).tolist()]
+
+
+def largest_component(G: nx.Graph) -> nx.Graph:
+    """
+    Keep the largest connected component, relabelled to 0..n-1
+
+    Components are labelled in one C pass (scipy csgraph over the edge index
+    arrays), then only the winning component is copied and relabelled in the
+    same sweep (node order and node/edge attributes are preserved).
+    """
+    H = G.__class__()
+    n = G.number_of_nodes()
+    if n == 0:
+        return H
+
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    m = G.number_of_edges()
+    ends = np.fromiter((index[x] for e in G.edges() for x in e[:2]),
+                       dtype=np.int64, count=2 * m).reshape(-1, 2)
+    A = sp.coo_array((np.ones(m, dtype=np.int8), (ends[:, 0], ends[:, 1])), shape=(n, n))
+    _, labels = connected_components(A, directed=False)
+
+    # Lowest label wins ties, i.e. the component met first in node order
+    kept = np.flatnonzero(labels == np.bincount(labels).argmax()).tolist()
+    idx = {nodes[i]: k for k, i in enumerate(kept)}
+
+    H.add_nodes_from((k, G.nodes[nodes[i]]) for k, i in enumerate(kept))
+    H.add_edges_from((idx[u], idx[v], d) for u, v, d in G.edges(data=True) if u in idx)
+    return H
+
+
+def edges_to_graph(nodes, u, v, length, weight_scale=100.0) -> nx.Graph:
+    """
+    Build a simple weighted graph from parallel endpoint/length arrays
+
+    Nodes keep the order of `nodes` (so node 0 is the same depot as before).
+    Duplicate (undirected) edges keep their first occurrence; missing lengths
+    default to 100 m. Weights are computed in one pass (scale_lengths).
+    """
+    edges = pd.DataFrame({'u': u, 'v': v, 'length': length})
+    edges['length'] = edges['length'].astype(np.float64).fillna(100.0)
+
+    # Canonical (min, max) key so u->v and v->u collapse to one edge
+    a = edges['u'].to_numpy()
+    b = edges['v'].to_numpy()
+    key = pd.DataFrame({'lo': np.minimum(a, b), 'hi': np.maximum(a, b)})
+    edges = edges[~key.duplicated().to_numpy()]
+
+    edges['weight'] = scale_lengths(edges['length'].to_numpy(), 1.0 / weight_scale, 100.0)
+
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from((a, b, {'weight': w, 'length': l})
+                     for a, b, l, w in edges.itertuples(index=False, name=None))
+    return largest_component(G)
+
+
+def osm_to_simple_graph(G: nx.MultiDiGraph, weight_scale=100.0) -> nx.Graph:
+    """Convert an osmnx/pyrosm (multi)graph to a simple integer-labelled graph"""
+    u, v, length = [], [], []
+    for a, b, data in G.edges(data=True):
+        u.append(a)
+        v.append(b)
+        length.append(data.get('length', np.nan))
+
+    return edges_to_graph(G.nodes(), u, v, length, weight_scale)
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """Great-circle distance in metres (vectorized over arrays)"""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371008.8 * np.arcsin(np.sqrt(a))
+
+
+def pbf_bbox_to_graph_streaming(pbf_path, bbox=WESTMINSTER_BBOX, weight_scale=100.0,
+                                location_index="flex_mem") -> nx.Graph:
+    """
+    Stream the drivable network inside bbox from a PBF with pyosmium
+
+    One linear read of the file: osmium's C++ reader resolves node locations
+    into `location_index` as it goes, and only the endpoint ids/coordinates of
+    highway segments inside bbox are kept (in flat arrays), so no per-feature
+    Python objects or GeoDataFrames are built. Segment lengths are computed
+    afterwards in one vectorized haversine pass.
+
+    Args:
+        pbf_path: Geofabrik .osm.pbf file
+        bbox: (north, south, east, west)
+        weight_scale: weight = length (m) / weight_scale
+        location_index: osmium node-location index, e.g. "flex_mem" or
+            "dense_file_array,nodes.cache" for country-sized extracts
+
+    Returns:
+        Simple integer-labelled nx.Graph (largest component)
+    """
+    from array import array
+
+    north, south, east, west = bbox
+
+    class DrivingSegments(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.u, self.v = array('q'), array('q')
+            self.coords = array('d')  # lon_u, lat_u, lon_v, lat_v per segment
+
+        def way(self, w):
+            if not is_driving_way(w.tags):
+                return
+
+            prev = None
+            for n in w.nodes:
+                loc = n.location
+                if not loc.valid() or not (south <= loc.lat <= north and west <= loc.lon <= east):
+                    prev = None
+                    continue
+                if prev is not None:
+                    self.u.append(prev[0])
+                    self.v.append(n.ref)
+                    self.coords.extend((prev[1], prev[2], loc.lon, loc.lat))
+                prev = (n.ref, loc.lon, loc.lat)
+
+    handler = DrivingSegments()
+    handler.apply_file(str(pbf_path), locations=True, idx=location_index)
+
+    u = np.frombuffer(handler.u, dtype=np.int64)
+    v = np.frombuffer(handler.v, dtype=np.int64)
+    coords = np.frombuffer(handler.coords, dtype=np.float64).reshape(-1, 4)
+    length = haversine_m(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3])
+
+    # Nodes in first-seen order along the ways
+    nodes = pd.unique(np.column_stack([u, v]).ravel())
+    return edges_to_graph(nodes, u, v, length, weight_scale)
+
+
+def _read_varint(buf, pos):
+    """Decode one protobuf varint, returning (value, next position)"""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def pbf_blob_ranges(pbf_path):
+    """
+    Byte ranges of the blocks in a PBF file, read from the BlobHeaders only
+
+    Each block is a 4-byte big-endian BlobHeader length, the BlobHeader
+    (protobuf: 1 = type, 3 = datasize) and the Blob itself; nothing is
+    decompressed here.
+
+    Returns:
+        (header, data) with header the OSMHeader block's (start, end) and data
+        a list of (start, end) for every OSMData block, in file order
+    """
+    import mmap
+
+    header, data = None, []
+    with open(pbf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        pos = 0
+        while pos < len(buf):
+            start = pos
+            header_len = int.from_bytes(buf[pos:pos + 4], 'big')
+            pos += 4
+            end_header = pos + header_len
+
+            blob_type, data_size = None, 0
+            while pos < end_header:
+                key, pos = _read_varint(buf, pos)
+                field, wire = key >> 3, key & 7
+                if wire == 0:
+                    value, pos = _read_varint(buf, pos)
+                    if field == 3:
+                        data_size = value
+                elif wire == 2:
+                    length, pos = _read_varint(buf, pos)
+                    if field == 1:
+                        blob_type = bytes(buf[pos:pos + length])
+                    pos += length
+                else:
+                    raise ValueError(f"Unexpected wire type {wire} in BlobHeader at byte {start}")
+
+            pos = end_header + data_size
+            if blob_type == b'OSMHeader':
+                header = (start, pos)
+            else:
+                data.append((start, pos))
+
+    if header is None:
+        raise ValueError(f"{pbf_path} has no OSMHeader block")
+    return header, data
+
+
+def _decode_pbf_chunk(pbf_path, header, start, end, bbox):
+    """
+    Worker: decode the OSMData blocks in [start, end) of a PBF
+
+    The chunk is decoded on its own (OSMHeader + its blocks as one buffer).
+    Way node locations usually live in other chunks, so instead of resolving
+    them here the chunk returns the bbox nodes it holds plus the node refs of
+    its drivable ways; the parent joins the two.
+
+    Returns:
+        (ids, lonlat, refs, way_ends): ids/lonlat of nodes inside bbox, the
+        flattened node refs of drivable ways and each way's end offset in refs
+    """
+    import mmap
+    from array import array
+
+    north, south, east, west = bbox
+
+    class ChunkHandler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.ids, self.lonlat = array('q'), array('d')
+            self.refs, self.way_ends = array('q'), array('q')
+
+        def node(self, n):
+            loc = n.location
+            if loc.valid() and south <= loc.lat <= north and west <= loc.lon <= east:
+                self.ids.append(n.id)
+                self.lonlat.extend((loc.lon, loc.lat))
+
+        def way(self, w):
+            if is_driving_way(w.tags):
+                self.refs.extend(n.ref for n in w.nodes)
+                self.way_ends.append(len(self.refs))
+
+    with open(pbf_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        chunk = buf[header[0]:header[1]] + buf[start:end]
+
+    handler = ChunkHandler()
+    handler.apply_buffer(chunk, 'pbf')
+    return (np.frombuffer(handler.ids, dtype=np.int64),
+            np.frombuffer(handler.lonlat, dtype=np.float64).reshape(-1, 2),
+            np.frombuffer(handler.refs, dtype=np.int64),
+            np.frombuffer(handler.way_ends, dtype=np.int64))
+
+
+def pbf_bbox_to_graph_parallel(pbf_path, bbox=WESTMINSTER_BBOX, weight_scale=100.0,
+                               workers=None) -> nx.Graph:
+    """
+    Same network as pbf_bbox_to_graph_streaming, decoded on all cores
+
+    The block index is scanned once (pbf_blob_ranges), the data blocks are
+    split into `workers` contiguous chunks of about equal size and each chunk
+    is decompressed/decoded in its own process. The per-chunk arrays are then
+    concatenated in file order and a segment is kept where two consecutive
+    refs of a way both lie inside bbox, so the graph (node order included)
+    matches the single-pass reader.
+
+    Args:
+        pbf_path: Geofabrik .osm.pbf file
+        bbox: (north, south, east, west)
+        weight_scale: weight = length (m) / weight_scale
+        workers: Processes to use (default: os.cpu_count())
+
+    Returns:
+        Simple integer-labelled nx.Graph (largest component)
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    header, blocks = pbf_blob_ranges(pbf_path)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(blocks)))
+
+    # Cut the block list where the cumulative size crosses each 1/workers share
+    ends = np.cumsum([end - start for start, end in blocks])
+    cuts = np.searchsorted(ends, ends[-1] * np.arange(1, workers) / workers) if blocks else []
+    bounds = [0, *sorted(set(int(c) + 1 for c in cuts)), len(blocks)]
+    chunks = [(blocks[a][0], blocks[b - 1][1]) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        parts = list(ex.map(_decode_pbf_chunk, *zip(*[(str(pbf_path), header, a, b, bbox)
+                                                      for a, b in chunks])))
+
+    ids = np.concatenate([p[0] for p in parts])
+    lonlat = np.concatenate([p[1] for p in parts])
+    refs = np.concatenate([p[2] for p in parts])
+    offsets = np.cumsum([0] + [len(p[2]) for p in parts[:-1]])
+    way_ends = np.concatenate([p[3] + off for p, off in zip(parts, offsets)])
+
+    # Look every ref up among the bbox nodes (sorted ids + searchsorted)
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, refs), max(len(sorted_ids) - 1, 0))
+    inside = (sorted_ids[pos] == refs) if len(sorted_ids) else np.zeros(len(refs), dtype=bool)
+    where = order[pos] if len(sorted_ids) else pos
+
+    # Segment i -> i+1 is kept if both ends are inside and it does not cross a way end
+    same_way = np.ones(max(len(refs) - 1, 0), dtype=bool)
+    same_way[way_ends[way_ends < len(refs)] - 1] = False
+    seg = np.flatnonzero(same_way & inside[:-1] & inside[1:])
+
+    u, v = refs[seg], refs[seg + 1]
+    a, b = lonlat[where[seg]], lonlat[where[seg + 1]]
+    length = haversine_m(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+
+    nodes = pd.unique(np.column_stack([u, v]).ravel())
+    return edges_to_graph(nodes, u, v, length, weight_scale)
+
+
+def pbf_bbox_to_graph(pbf_path, bbox=WESTMINSTER_BBOX, weight_scale=100.0) -> nx.Graph:
+    """
+    Read the drivable network inside bbox straight from a local PBF (pyrosm)
+
+    Args:
+        pbf_path: Geofabrik .osm.pbf file
+        bbox: (north, south, east, west)
+        weight_scale: weight = length (m) / weight_scale
+
+    Returns:
+        Simple integer-labelled nx.Graph (largest component)
+    """
+    from pyrosm import OSM
+
+    north, south, east, west = bbox
+    osm = OSM(str(pbf_path), bounding_box=[west, south, east, north])
+    nodes, edges = osm.get_network(network_type="driving", nodes=True)
+
+    return edges_to_graph(nodes['id'].to_numpy(), edges['u'].to_numpy(), edges['v'].to_numpy(),
+                          edges['length'].to_numpy(), weight_scale)
@@ -0,0 +1,668 @@
+"""
+UNIFIED CPP PIPELINE
+Shared driver behind FINAL_pipeline.py and complete_overnight.py
+
+Modes:
+  final      - data/*.gml + OSM-derived GraphML, CPP-LC (corrected), Random Forest ML
+  overnight  - generated benchmarks + London download, CPP-LC (simplified), linear ML
+
+Usage:
+  python pipeline.py --mode final
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+import pandas as pd
+import networkx as nx
+import numpy as np
+import argparse
+import os
+import csv
+import logging
+import pickle
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import MISSING, fields
+
+from benchmark_generator import BenchmarkGenerator
+from cpp_adapters import solve_classical_cpp, solve_greedy_heuristic
+from cpp_lc_corrected import solve_cpp_lc_corrected
+from fast_cpp_lc import SimplifiedCPPLC
+from simple_ml_cpp import SimpleMLCPP
+from improved_ml_cpp import ImprovedMLCPP
+from experimental_pipeline import ExperimentResult
+from download_london import quick_london_download
+
+BAR = "=" * 70
+CACHE_DIR = Path("data/.cache")
+MAX_NODES = 1000  # Larger GraphML inputs are too big for exact matching (northern_zones: 1922)
+
+# Solver failures go to <output_dir>/errors.log with full tracebacks
+logger = logging.getLogger('pipeline')
+
+# Result rows follow the ExperimentResult field order
+RESULT_COLUMNS = [f.name for f in fields(ExperimentResult)]
+RESULT_DEFAULTS = {f.name: f.default for f in fields(ExperimentResult) if f.default is not MISSING}
+
+
+# ==================== GRAPH LOADING ====================
+
+def load_graph_npz(npz_path):
+    """Build a graph from a binary edge list written by convert_graphs.py"""
+    with np.load(npz_path) as npz:
+        G = nx.Graph()
+        G.add_nodes_from(range(int(npz['n'])))
+        G.add_weighted_edges_from(zip(npz['src'].tolist(), npz['dst'].tolist(), npz['w'].tolist()))
+    return G
+
+
+def load_graph_cached(path):
+    """Load a GML/GraphML graph, reusing a pickled copy keyed by mtime + size"""
+    path = Path(path)
+    stat = path.stat()
+
+    # Prefer the pre-converted binary edge list when it is up to date
+    npz_path = path.with_suffix(".npz")
+    if npz_path.exists() and npz_path.stat().st_mtime_ns >= stat.st_mtime_ns:
+        return load_graph_npz(npz_path)
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    # Name the pickle after the whole path (suffix and directories included),
+    # so same-stem graphs never share - and keep overwriting - one cache file
+    try:
+        rel_path = path.resolve().relative_to(Path.cwd().resolve())
+    except ValueError:
+        rel_path = path.resolve()  # Outside the working directory
+    cache_file = CACHE_DIR / (rel_path.as_posix().strip("/").replace("/", "__") + ".pkl")
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, G = pickle.load(f)
+            if cached_key == key:
+                return G
+        except Exception:
+            pass  # Stale or corrupt cache - reparse below
+
+    if path.suffix == ".graphml":
+        G = nx.read_graphml(str(path))
+    else:
+        G = nx.read_gml(str(path))
+    # Convert to integers for consistency (OSM has string nodes)
+    G = nx.convert_node_labels_to_integers(G)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'wb') as f:
+        pickle.dump((key, G), f, protocol=5)
+
+    return G
+
+
+def scan_files(directory, suffix):
+    """List files in directory ending with suffix (one scandir, no per-entry stat)"""
+    with os.scandir(directory) as it:
+        return [Path(e.path) for e in it if e.is_file() and e.name.endswith(suffix)]
+
+
+def peek_graphml_size(path, limit=MAX_NODES):
+    """
+    Count <node> elements with a streaming parse, stopping once limit is exceeded
+
+    Returns the node count (or limit + 1 if the file is larger than limit).
+    """
+    count = 0
+    for _, elem in ET.iterparse(path, events=('end',)):
+        if elem.tag.rsplit('}', 1)[-1] == 'node':
+            count += 1
+            if count > limit:
+                break
+        elem.clear()
+    return count
+
+
+def _load_one(path):
+    """Load a single input graph for the process pool, returning (name, G or None)"""
+    if path.suffix == ".graphml":
+        # SKIP anything too large for matching (e.g. northern_zones) before the full parse
+        if peek_graphml_size(path) > MAX_NODES:
+            print(f"⏭️  Skipping {path.stem} (> {MAX_NODES} nodes, too large for matching)")
+            return path.stem, None
+
+        # Use friendly name
+        name = "london_real" if "london" in path.stem else path.stem
+        try:
+            G = load_graph_cached(path)
+            print(f"✅ Loaded {name} ({G.number_of_nodes()} nodes)")
+            return name, G
+        except Exception as e:
+            print(f"⚠️  Failed to load {path.name}: {e}")
+            return name, None
+
+    try:
+        return path.stem, load_graph_cached(path)
+    except Exception:
+        return path.stem, None
+
+
+def load_graph_files():
+    """
+    Load data/*.gml and benchmarks/osm_derived/*.graphml (parsed in parallel)
+
+    Returns:
+        (graphs, info) keyed by instance_id
+    """
+    graphs = {}
+
+    data_dir = Path("data")
+    osm_dir = Path("benchmarks/osm_derived")
+    paths = scan_files(data_dir, ".gml")
+    if osm_dir.exists():
+        paths += scan_files(osm_dir, ".graphml")
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for name, G in ex.map(_load_one, paths):
+            if G is not None:
+                graphs[name] = G
+
+    info = {name: {'network_family': 'benchmark', 'size': 'various'} for name in graphs}
+    return graphs, info
+
+
+def load_benchmark_instances():
+    """
+    Load every generated benchmark instance once, plus the London download
+
+    Returns:
+        (graphs, info) keyed by instance_id
+    """
+    gen = BenchmarkGenerator(output_dir="benchmarks")
+    graphs = {}
+    info = {}
+
+    for instance_id in gen.get_instance_list():
+        try:
+            instance = gen.load_instance(instance_id)
+        except Exception as e:
+            print(f"  ✗ Failed to load {instance_id}: {e}")
+            continue
+
+        graphs[instance_id] = instance.graph
+        info[instance_id] = {
+            'network_family': instance.metadata.network_family,
+            'size': instance.metadata.size,
+            'edge_demands': instance.edge_demands,
+            'capacity': instance.vehicle_capacity,
+        }
+
+    print("\nDownloading London street network...")
+    G_london = quick_london_download()
+    if G_london:
+        print(f"✅ London data downloaded! ({G_london.number_of_nodes()} nodes)")
+        graphs['london_westminster'] = G_london
+        info['london_westminster'] = {'network_family': 'osm_real', 'size': 'real_world'}
+    else:
+        print("⚠️  London download failed - continuing without real data...")
+
+    return graphs, info
+
+
+# ==================== HELPERS ====================
+
+def setup_error_log(output_dir):
+    """Send 'pipeline' logger records (with tracebacks) to output_dir/errors.log"""
+    handler = logging.FileHandler(output_dir / "errors.log", mode='w')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+class ResultStream:
+    """Append result rows to a CSV as they are produced, so partial runs are kept"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=RESULT_COLUMNS)
+        self.writer.writeheader()
+        self.counts = Counter()
+
+    def add(self, **row):
+        """Write one row, filling ExperimentResult defaults for missing fields"""
+        for col in RESULT_COLUMNS:
+            if col not in row:
+                row[col] = RESULT_DEFAULTS[col]
+        if row['metadata'] is None:
+            row['metadata'] = {}
+        self.writer.writerow(row)
+        self.file.flush()
+        self.counts[row['algorithm']] += 1
+
+    def close(self):
+        self.file.close()
+
+
+def graph_to_arrays(G):
+    """Return (edges, weights): an (m, 2) int32 endpoint array and float64 weights"""
+    edges = np.asarray(list(G.edges()), dtype=np.int32).reshape(-1, 2)
+    weights = np.fromiter((G[u][v].get('weight', 1.0) for u, v in edges.tolist()),
+                          dtype=np.float64, count=len(edges))
+    return edges, weights
+
+
+def generate_edge_demands(edges, weights, seed):
+    """
+    Generate symmetric CPP-LC demands proportional to edge weight
+
+    Returns:
+        (edge_demands, total_demand) where edge_demands has both (u, v) and (v, u)
+    """
+    demands = weights * np.random.default_rng(seed).uniform(0.5, 2.0, size=len(edges))
+
+    edge_demands = {}
+    for (u, v), demand in zip(edges.tolist(), demands.tolist()):
+        edge_demands[(u, v)] = demand
+        edge_demands[(v, u)] = demand
+
+    return edge_demands, float(demands.sum())
+
+
+# Helper function to convert edge sequences to node sequences
+def edges_to_node_sequence(edge_list):
+    """Convert Eulerian circuit edge list to node sequence for ML training"""
+    if not edge_list:
+        return []
+    arr = np.asarray(edge_list, dtype=np.int64)
+    nodes = np.empty(arr.shape[0] + 1, dtype=np.int64)
+    nodes[0] = arr[0, 0]  # Start with first node
+    nodes[1:] = arr[:, 1]  # Add each endpoint
+    return nodes.tolist()
+
+
+# ==================== SOLVERS ====================
+# Each solver takes (G, info) and returns (cost, tour, metadata), or None to skip
+
+def solve_classical(G, info):
+    """Classical CPP with a 10 minute timeout, flagged if it fell back to approximation"""
+    result = solve_classical_cpp(G, timeout_seconds=600)
+    approximation_mode = result.get('approximation_mode', False)
+
+    metadata = {
+        'baseline_type': 'APPROXIMATION' if approximation_mode else 'OPTIMAL',
+        'approximation_mode': approximation_mode,
+        'failure_reason': result.get('failure_reason'),
+        'num_odd_vertices': result.get('num_odd_vertices')
+    }
+    return result['cost'], result['tour'], metadata
+
+
+def solve_greedy(G, info):
+    """Nearest-unvisited-edge greedy heuristic"""
+    cost, tour = solve_greedy_heuristic(G)
+    return cost, tour, None
+
+
+def solve_cpp_lc_corrected_instance(G, info):
+    """CPP-LC (corrected) with the demands/capacity stored in info"""
+    if info.get('edge_demands') is None:
+        return None
+    return solve_cpp_lc_corrected(G, info['edge_demands'], info['capacity'])
+
+
+def solve_cpp_lc_fast(G, info):
+    """Simplified greedy CPP-LC with the demands/capacity stored in info"""
+    if info.get('edge_demands') is None:
+        return None
+    return SimplifiedCPPLC(G, info['edge_demands'], info['capacity']).solve_fast()
+
+
+MODES = {
+    'final': {
+        'title': "FINAL COMPLETE PIPELINE",
+        'intro': [
+            "25 benchmark graphs from data/",
+            "London real network (150 nodes)",
+            "Classical CPP (optimal)",
+            "Greedy heuristic",
+            "CPP-LC (FIXED - now increases costs!)",
+            "ML learning",
+        ],
+        'estimate': "10-15 minutes",
+        'confirm': False,
+        'load': load_graph_files,
+        'generate_demands': True,
+        'output_dir': "results_final_complete",
+        'algorithms': ['classical_cpp', 'greedy', 'ml_improved', 'cpp_lc_corrected'],
+        'cpp_lc': ('cpp_lc_corrected', 'load_dependent', solve_cpp_lc_corrected_instance),
+        'ml': ('ml_improved', 'random_forest', ImprovedMLCPP),
+        'ml_train_limit': None,
+    },
+    'overnight': {
+        'title': "COMPLETE OVERNIGHT PIPELINE",
+        'intro': [
+            "Classical CPP (baseline)",
+            "Greedy Heuristic",
+            "CPP-LC (simplified, fast)",
+            "ML/RL Learning (simple baseline)",
+            "Real London data",
+        ],
+        'estimate': "30-60 minutes",
+        'confirm': True,
+        'load': load_benchmark_instances,
+        'generate_demands': False,
+        'output_dir': "results_complete",
+        'algorithms': ['classical_cpp', 'greedy', 'cpp_lc_fast', 'ml_learning'],
+        'cpp_lc': ('cpp_lc_fast', 'cpp_lc_simplified', solve_cpp_lc_fast),
+        'ml': ('ml_learning', 'ml_baseline', SimpleMLCPP),
+        'ml_train_limit': 20,  # Train on first 20
+    },
+}
+
+
+# ==================== DRIVER ====================
+
+def timed_solve(solve, *args):
+    """Call solve(*args) and return (solution, runtime_seconds); runs inside pool workers"""
+    t0 = time.perf_counter_ns()
+    solution = solve(*args)
+    return solution, (time.perf_counter_ns() - t0) * 1e-9
+
+
+def quiet_worker():
+    """Pool initializer: drop solver chatter so parallel tasks don't interleave it"""
+    sys.stdout = open(os.devnull, 'w')
+
+
+def map_solve(solve, arg_list, workers=None):
+    """
+    Yield timed_solve(solve, *args) for every args tuple, in input order
+
+    The solves are independent, so they are spread over a process pool
+    (workers=None uses every core); workers=1 runs them in-process for
+    debugging. A failing solve yields its exception instead of a result.
+    """
+    if workers == 1:
+        for args in arg_list:
+            try:
+                yield timed_solve(solve, *args)
+            except Exception as e:
+                yield e
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+        futures = [ex.submit(timed_solve, solve, *args) for args in arg_list]
+        for fut in futures:
+            try:
+                yield fut.result()
+            except Exception as e:
+                yield e
+
+
+def run_algo_sweep(graphs, info, classical_costs, solvers, results,
+                   on_result=None, progress_every=None):
+    """
+    Run each solver on each graph and stream one row per successful solve
+
+    Graph-major order, so each graph's adjacency stays hot across solvers.
+    classical_cpp costs are recorded in classical_costs as they come in and
+    every other algorithm's gap is taken against them.
+
+    Args:
+        solvers: list of (algorithm, variant, solve) with solve(G, info)
+        results: ResultStream receiving the rows
+        on_result: optional callback(algorithm, instance_id, cost, tour, metadata),
+                   called outside the timed span
+        progress_every: print progress every N graphs
+    """
+    n_graphs = len(graphs)
+    failures = Counter()
+
+    for i, (instance_id, G) in enumerate(graphs.items(), 1):
+        graph_info = info[instance_id]
+
+        for algorithm, variant, solve in solvers:
+            try:
+                t0 = time.perf_counter_ns()
+                solution = solve(G, graph_info)
+                runtime = (time.perf_counter_ns() - t0) * 1e-9
+            except Exception as e:
+                logger.exception("%s failed on %s", algorithm, instance_id)
+                failures[algorithm] += 1
+                if failures[algorithm] <= 3:  # Print first few errors; the rest are only in errors.log
+                    print(f"  ✗ {algorithm} failed on {instance_id}: {e}")
+                continue
+
+            if solution is None:
+                continue
+            cost, tour, metadata = solution
+
+            if algorithm == 'classical_cpp':
+                classical_costs[instance_id] = cost
+            base = classical_costs.get(instance_id, cost)
+            gap = (cost - base) / base * 100 if base > 0 else 0.0
+
+            results.add(
+                instance_id=instance_id,
+                algorithm=algorithm,
+                variant=variant,
+                cost=cost,
+                tour_length=len(tour) if tour else 0,
+                feasible=True,
+                runtime_seconds=runtime,
+                num_nodes=G.number_of_nodes(),
+                num_edges=G.number_of_edges(),
+                network_family=graph_info['network_family'],
+                size=graph_info['size'],
+                gap_from_classical=gap,
+                metadata=metadata
+            )
+
+            if on_result is not None:
+                on_result(algorithm, instance_id, cost, tour, metadata)
+
+        if progress_every and i % progress_every == 0:
+            print(f"  Progress: {i}/{n_graphs}")
+
+
+def run_pipeline(mode='final'):
+    """Run every algorithm on every graph of the given mode and save the results"""
+    config = MODES[mode]
+    cpp_lc_algo = config['cpp_lc'][0]
+    ml_algo, ml_variant, ml_class = config['ml']
+
+    print(BAR)
+    print(config['title'])
+    print(BAR)
+    print("\nIncluded:")
+    for line in config['intro']:
+        print(f"  ✓ {line}")
+    print(f"\nEstimated time: {config['estimate']}\n")
+
+    if config['confirm']:
+        input("Press Enter to start...")
+    else:
+        print("Starting automatically...\n")
+
+    # Wall clock on purpose: this is the human-facing total run time.
+    # Per-solver runtimes use perf_counter_ns (monotonic, sub-microsecond).
+    start_time = time.time()
+
+    graphs, info = config['load']()
+
+    # Fixed order regardless of filesystem/scandir order: smallest graphs first so
+    # caches warm up early and the slow classical solves come last. The order
+    # (and so the CPP-LC demand seeds) now only depends on the graph contents.
+    graphs = dict(sorted(graphs.items(), key=lambda kv: (kv[1].number_of_edges(), kv[0])))
+    n_graphs = len(graphs)
+
+    if config['generate_demands']:
+        # GENERATE realistic demands (graphs don't have demand attributes!)
+        for i, (instance_id, G) in enumerate(graphs.items(), 1):
+            edges, weights = graph_to_arrays(G)
+            if len(edges) == 0:
+                print(f"  ⚠️  {instance_id}: No edges, skipping CPP-LC")
+                continue
+            edge_demands, total_demand = generate_edge_demands(edges, weights, seed=42 + i)  # Deterministic
+            info[instance_id]['edge_demands'] = edge_demands
+            info[instance_id]['capacity'] = total_demand * 0.4  # Tight capacity (40% of total)
+    else:
+        for graph_info in info.values():
+            # Use existing demands
+            if graph_info.get('edge_demands') is not None and not graph_info.get('capacity'):
+                graph_info['capacity'] = sum(graph_info['edge_demands'].values()) / 2 * 0.4
+
+    print(f"\n✅ Loaded {n_graphs} total graphs\n")
+
+    output_dir = Path(config['output_dir'])
+    output_dir.mkdir(exist_ok=True)
+    log_handler = setup_error_log(output_dir)
+
+    # Rows are streamed to all_results.csv as each algorithm finishes
+    results = ResultStream(output_dir / "all_results.csv")
+    classical_costs = {}
+    training_data = []  # (instance_id, node tour); graphs are looked up from `graphs`
+
+    def record_classical(algorithm, instance_id, cost, tour, metadata):
+        """Print classical status and keep exact tours for ML training"""
+        if algorithm != 'classical_cpp':
+            return
+        approximation_mode = metadata['approximation_mode']
+
+        # Only add to training data if not in approximation mode
+        # Convert edge sequence to node sequence for ML training
+        if not approximation_mode:
+            node_tour = array('i', edges_to_node_sequence(tour) if tour else [])
+            training_data.append((instance_id, node_tour))
+
+        status = "⚠️ APPROX" if approximation_mode else "✓ OPTIMAL"
+        print(f"  [{len(classical_costs)}/{n_graphs}] {instance_id}: {status} cost={cost:.2f}")
+
+    # ==================== CLASSICAL + GREEDY + CPP-LC ====================
+    # ML needs every classical tour for training, so it runs after.
+    print(BAR)
+    print("1/2: Classical CPP + Greedy + CPP-LC (Load-Dependent Costs)")
+    print(BAR)
+
+    run_algo_sweep(
+        graphs, info, classical_costs,
+        [('classical_cpp', 'classical', solve_classical),
+         ('greedy', 'greedy', solve_greedy),
+         config['cpp_lc']],
+        results,
+        on_result=record_classical
+    )
+
+    print(f"  ✅ {results.counts['classical_cpp']} classical results")
+    print(f"  ✅ {results.counts['greedy']} greedy results")
+    print(f"  ✅ {results.counts[cpp_lc_algo]} CPP-LC results\n")
+
+    # ==================== ML LEARNING ====================
+    print(BAR)
+    print(f"2/2: ML Learning ({ml_class.__name__})")
+    print(BAR)
+
+    ml_solver = ml_class()
+    if config['ml_train_limit']:
+        training_data = training_data[:config['ml_train_limit']]
+
+    try:
+        print(f"  Training on {len(training_data)} graphs...")
+
+        if ml_solver.train_from_solutions([(graphs[iid], tour) for iid, tour in training_data]):
+            print("  ✓ Training complete")
+
+            run_algo_sweep(
+                graphs, info, classical_costs,
+                [(ml_algo, ml_variant, lambda G, graph_info: ml_solver.solve_with_learning(G))],
+                results,
+                progress_every=5
+            )
+
+            print(f"  ✅ {results.counts[ml_algo]} results\n")
+        else:
+            print("  ⚠️  Training failed - no ML results\n")
+    except Exception as e:
+        logger.exception("ML training failed")
+        print(f"  ✗ ML training error: {e} (traceback in errors.log)\n")
+
+    # ==================== SAVE ====================
+    print(BAR)
+    print("SAVING RESULTS")
+    print(BAR)
+
+    results.close()
+    logger.removeHandler(log_handler)
+    log_handler.close()
+    print(f"  ✓ {output_dir / 'all_results.csv'}")
+
+    # Read back only for the summary aggregation
+    df = pd.read_csv(output_dir / "all_results.csv")
+
+    df['algorithm'] = df['algorithm'].astype(pd.CategoricalDtype(config['algorithms']))
+    summary = df.groupby('algorithm', sort=False, observed=True).agg(
+        n=('cost', 'count'),
+        cost_mean=('cost', 'mean'),
+        cost_std=('cost', 'std'),
+        runtime_mean=('runtime_seconds', 'mean'),
+        gap_mean=('gap_from_classical', 'mean'),
+        gap_std=('gap_from_classical', 'std')
+    ).round(3)
+
+    print("\n" + BAR)
+    print("SUMMARY")
+    print(BAR)
+    print(summary)
+
+    summary.to_csv(output_dir / "summary.csv")
+
+    # Key findings
+    print("\n" + BAR)
+    print("KEY FINDINGS")
+    print(BAR)
+
+    for algo, row in summary.iterrows():
+        print(f"  {algo}: {int(row['n'])} instances, {row['gap_mean']:.1f}% avg gap")
+
+    # CPP-LC specific
+    if cpp_lc_algo in summary.index:
+        avg_increase = summary.loc[cpp_lc_algo, 'gap_mean']
+        print(f"\n🔥 CPP-LC cost increase: {avg_increase:.1f}%")
+        if avg_increase > 0:
+            print("   ✅ POSITIVE (as expected!)")
+        else:
+            print("   ⚠️  Still negative - check implementation")
+
+    # London specifically
+    london_results = df[df['instance_id'].str.startswith('london')]
+    if not london_results.empty:
+        print(f"\n🌍 LONDON RESULTS:")
+        for row in london_results.itertuples():
+            print(f"   {row.algorithm}: cost={row.cost:.1f}, gap={row.gap_from_classical:.1f}%")
+
+    elapsed = time.time() - start_time
+
+    print("\n" + BAR)
+    print("✅ COMPLETE!")
+    print(BAR)
+    print(f"Total results: {len(df)}")
+    print(f"Total graphs: {n_graphs}")
+    print(f"Total time: {elapsed/60:.1f} minutes")
+    print(f"\nResults saved to: {output_dir}/")
+
+    print("\n🎯 Next: Generate plots and write paper!")
+    print("   python3 complete_plots.py")
+
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the CPP experiment pipeline')
+    parser.add_argument('--mode', choices=sorted(MODES), default='final',
+                        help='final: data/ graphs; overnight: generated benchmarks + London')
+    args = parser.parse_args()
+
+    run_pipeline(mode=args.mode)
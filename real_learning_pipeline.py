@@ -10,15 +10,95 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 import torch
+import numpy as np
 import pandas as pd
+import os
 import time
 import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
 
 from benchmark_generator import BenchmarkGenerator
 from cpp_adapters import solve_classical_cpp, solve_greedy_heuristic
 from fast_cpp_lc import SimplifiedCPPLC
 from deep_rl_cpp import DeepRLCPP
 from experimental_pipeline import ExperimentResult
+from pipeline import CACHE_DIR, ResultStream, quiet_worker
+
+META_FIELDS = ('num_nodes', 'num_edges', 'network_family', 'size')
+
+# Encoder precision for the Part 3 evaluation (None = float32). torch.bfloat16
+# makes it ~3x faster on CPU, but coarser scores reorder near-tied nodes in
+# the greedy tours (a few % cost drift on the benchmarks), so it is opt-in.
+RL_EVAL_DTYPE = None
+
+RL_FEATURE_CACHE = CACHE_DIR / "rl_features"
+
+
+def _gaps(costs, classical):
+    """
+    Percent gaps of costs from the matching classical costs, all at once
+
+    Where the classical solve failed (NaN) the cost is its own baseline, so
+    the gap is 0; a non-positive baseline also gives 0.
+    """
+    base = np.where(np.isnan(classical), costs, classical)
+    safe = np.where(base > 0, base, 1.0)
+    return np.where(base > 0, (costs - base) / safe * 100.0, 0.0)
+
+
+def load_rl_features(agent, gen, instance_id, G):
+    """
+    The agent's graph_to_features tensors for one benchmark instance, cached
+
+    Saved as a .pt under RL_FEATURE_CACHE, keyed by the instance pickle's
+    mtime + size and the embedding size; a stale or unreadable entry is
+    rebuilt from G.
+    """
+    stat = gen.instance_path(instance_id).stat()
+    key = [stat.st_mtime_ns, stat.st_size, agent.embedding_dim]
+    cache_file = RL_FEATURE_CACHE / f"{instance_id}.pt"
+    
+    if cache_file.exists():
+        try:
+            cached = torch.load(cache_file)
+            if cached['key'] == key:
+                return cached['node_features'], cached['adj_matrix']
+        except Exception:
+            pass  # Stale or corrupt cache - rebuild below
+    
+    node_features, adj_matrix = agent.graph_to_features(G)
+    
+    RL_FEATURE_CACHE.mkdir(parents=True, exist_ok=True)
+    torch.save({'key': key, 'node_features': node_features, 'adj_matrix': adj_matrix},
+               cache_file)
+    
+    return node_features, adj_matrix
+
+
+# Workers: one task per (instance, algorithm). Module-level so they pickle
+# into ProcessPoolExecutor; only solver inputs go out and only
+# (cost, tour, ..., runtime) comes back - result rows are built in main().
+
+def _run_classical(G):
+    start = time.time()
+    solution = solve_classical_cpp(G)
+    return solution['cost'], solution['tour'], time.time() - start
+
+
+def _run_greedy(G):
+    start = time.time()
+    cost, tour = solve_greedy_heuristic(G)
+    return cost, tour, time.time() - start
+
+
+def _run_cpp_lc(G, edge_demands, capacity):
+    solver = SimplifiedCPPLC(G, edge_demands, capacity)
+    
+    start = time.time()
+    cost, tour, meta = solver.solve_fast()
+    return cost, tour, meta, time.time() - start
+
 
 def main():
     """Run complete pipeline with REAL deep learning"""
@@ -50,93 +130,107 @@ def main():
     
     print(f"\n📊 Instances: {len(instance_ids)}")
     
-    results = []
+    # Load every instance once; all parts below reuse the in-memory pool
+    instances = {}
+    for instance_id in instance_ids:
+        try:
+            instances[instance_id] = gen.load_instance(instance_id)
+        except Exception as e:
+            print(f"  ✗ Failed to load {instance_id}: {e}")
+    instance_ids = list(instances)
+    
+    # Per-instance result columns read once from the metadata, reused by every part
+    _meta_get = attrgetter(*META_FIELDS)
+    instance_meta = {iid: dict(zip(META_FIELDS, _meta_get(inst.metadata)))
+                     for iid, inst in instances.items()}
+    
+    # Rows are appended to the CSV as each part produces them, so an
+    # interrupted run keeps what it has; the summary reads the file back
+    output_dir = Path("results_deep_rl")
+    output_dir.mkdir(exist_ok=True)
+    results_file = output_dir / "all_results.csv"
+    stream = ResultStream(results_file)
     
     # ==================== PART 1: BASELINES ====================
     print("\n" + "="*70)
     print("PART 1/5: Baseline Algorithms")
     print("="*70)
     
-    classical_costs = {}
+    # Classical costs by instance position (NaN where the solve failed);
+    # every later part computes its gaps against this array in one step
+    position = {iid: i for i, iid in enumerate(instance_ids)}
+    classical_arr = np.full(len(instance_ids), np.nan)
+    training_ids = []
     training_graphs = []
     training_solutions = []
     
-    print("\n1. Classical CPP (will use for RL training)...")
-    for i, instance_id in enumerate(instance_ids, 1):
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour = solve_classical_cpp(instance.graph)
-            runtime = time.time() - start
-            
-            classical_costs[instance_id] = cost
-            
-            # Save for RL training
-            training_graphs.append(instance.graph)
-            training_solutions.append((cost, tour))
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='classical_cpp',
-                variant='classical',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=0.0
-            )
-            
-            results.append(result)
-            
-            if i % 10 == 0:
-                print(f"  Progress: {i}/{len(instance_ids)}")
+    # Instances are independent: classical and greedy fan out over all cores
+    # together (gaps are computed here, once the classical costs are in)
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=quiet_worker) as ex:
+        classical = [ex.submit(_run_classical, instances[iid].graph) for iid in instance_ids]
+        greedy = [ex.submit(_run_greedy, instances[iid].graph) for iid in instance_ids]
+        
+        print("\n1. Classical CPP (will use for RL training)...")
+        classical_count = 0
+        for i, (instance_id, future) in enumerate(zip(instance_ids, classical), 1):
+            try:
+                cost, tour, runtime = future.result()
                 
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-    
-    print(f"  ✅ {len([r for r in results if r.algorithm == 'classical_cpp'])} results")
-    
-    print("\n2. Greedy Heuristic...")
-    for i, instance_id in enumerate(instance_ids, 1):
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour = solve_greedy_heuristic(instance.graph)
-            runtime = time.time() - start
-            
-            classical_cost = classical_costs.get(instance_id, cost)
-            gap = ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='greedy',
-                variant='greedy',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap
-            )
-            
-            results.append(result)
-            
-            if i % 10 == 0:
-                print(f"  Progress: {i}/{len(instance_ids)}")
+                classical_arr[i - 1] = cost
                 
-        except Exception as e:
-            pass
-    
-    print(f"  ✅ {len([r for r in results if r.algorithm == 'greedy'])} results")
+                # Save for RL training
+                training_ids.append(instance_id)
+                training_graphs.append(instances[instance_id].graph)
+                training_solutions.append((cost, tour))
+                
+                stream.add(instance_id=instance_id,
+                           algorithm='classical_cpp',
+                           variant='classical',
+                           cost=cost,
+                           tour_length=len(tour) if tour else 0,
+                           feasible=True,
+                           runtime_seconds=runtime,
+                           **instance_meta[instance_id],
+                           gap_from_classical=0.0)
+                classical_count += 1
+                
+                if i % 10 == 0:
+                    print(f"  Progress: {i}/{len(instance_ids)}")
+                    
+            except Exception as e:
+                print(f"  ✗ Error: {e}")
+        
+        print(f"  ✅ {classical_count} results")
+        
+        print("\n2. Greedy Heuristic...")
+        greedy_done = []
+        for i, (instance_id, future) in enumerate(zip(instance_ids, greedy), 1):
+            try:
+                cost, tour, runtime = future.result()
+                greedy_done.append((i - 1, cost, tour, runtime))
+                
+                if i % 10 == 0:
+                    print(f"  Progress: {i}/{len(instance_ids)}")
+                    
+            except Exception as e:
+                pass
+    
+    # Gaps for the whole pass in one vectorized step
+    positions = [row[0] for row in greedy_done]
+    gaps = _gaps(np.array([row[1] for row in greedy_done]), classical_arr[positions])
+    for (pos, cost, tour, runtime), gap in zip(greedy_done, gaps):
+        instance_id = instance_ids[pos]
+        stream.add(instance_id=instance_id,
+                   algorithm='greedy',
+                   variant='greedy',
+                   cost=cost,
+                   tour_length=len(tour) if tour else 0,
+                   feasible=True,
+                   runtime_seconds=runtime,
+                   **instance_meta[instance_id],
+                   gap_from_classical=gap)
+    
+    print(f"  ✅ {len(greedy_done)} results")
     
     # ==================== PART 2: DEEP RL TRAINING ====================
     print("\n" + "="*70)
@@ -155,6 +249,11 @@ def main():
         learning_rate=1e-3
     )
     
+    # Policy inputs for every instance, built once (or read from the disk
+    # cache) and shared by training and testing
+    rl_features = {iid: load_rl_features(rl_agent, gen, iid, instances[iid].graph)
+                   for iid in instance_ids}
+    
     # Train on subset (faster)
     n_train = min(40, len(training_graphs))
     print(f"Training on {n_train} instances...")
@@ -164,7 +263,8 @@ def main():
         training_graphs[:n_train],
         training_solutions[:n_train],
         n_epochs=50,  # Can increase for better results
-        batch_size=5
+        batch_size=5,
+        features=[rl_features[iid] for iid in training_ids[:n_train]]
     )
     train_time = time.time() - train_start
     
@@ -175,49 +275,42 @@ def main():
     print("PART 3/5: Testing Learned Policy")
     print("="*70)
     
-    print("\nDeploying learned policy on all instances...")
-    for i, instance_id in enumerate(instance_ids, 1):
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            start = time.time()
-            cost, tour, meta = rl_agent.solve(instance.graph, sampling=False)
-            runtime = time.time() - start
-            
-            classical_cost = classical_costs.get(instance_id, cost)
-            gap = ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='deep_rl',
-                variant='pointer_network',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap,
-                metadata=meta
-            )
-            
-            results.append(result)
-            
-            if i % 10 == 0:
-                print(f"  Progress: {i}/{len(instance_ids)}")
-                
-        except Exception as e:
-            pass
-    
-    rl_count = len([r for r in results if r.algorithm == 'deep_rl'])
-    print(f"  ✅ {rl_count} RL results")
+    print("\nDeploying learned policy on all instances (batched)...")
+    start = time.time()
+    rl_solutions = rl_agent.solve_batch([instances[iid].graph for iid in instance_ids],
+                                        autocast_dtype=RL_EVAL_DTYPE,
+                                        features=[rl_features[iid] for iid in instance_ids])
+    # One batched call: report the amortized per-instance time
+    runtime = (time.time() - start) / max(len(instance_ids), 1)
+    
+    # A failed graph comes back as its exception and only loses its own row
+    rl_done = []
+    for pos, (instance_id, solution) in enumerate(zip(instance_ids, rl_solutions)):
+        if isinstance(solution, Exception):
+            print(f"  ✗ Error on {instance_id}: {solution}")
+        else:
+            rl_done.append((pos, *solution))
+    
+    positions = [row[0] for row in rl_done]
+    rl_gaps = _gaps(np.array([row[1] for row in rl_done]), classical_arr[positions]).tolist()
+    for (pos, cost, tour, meta), gap in zip(rl_done, rl_gaps):
+        instance_id = instance_ids[pos]
+        stream.add(instance_id=instance_id,
+                   algorithm='deep_rl',
+                   variant='pointer_network',
+                   cost=cost,
+                   tour_length=len(tour) if tour else 0,
+                   feasible=True,
+                   runtime_seconds=runtime,
+                   **instance_meta[instance_id],
+                   gap_from_classical=gap,
+                   metadata=meta)
+    
+    print(f"  ✅ {len(rl_gaps)} RL results")
     
     # Quick performance summary
-    rl_results = [r for r in results if r.algorithm == 'deep_rl']
-    if rl_results:
-        avg_gap = sum(r.gap_from_classical for r in rl_results) / len(rl_results)
+    if rl_gaps:
+        avg_gap = sum(rl_gaps) / len(rl_gaps)
         print(f"  📊 Deep RL avg gap: {avg_gap:.1f}%")
     
     # ==================== PART 4: CPP-LC ====================
@@ -225,49 +318,41 @@ def main():
     print("PART 4/5: CPP-LC (Load-Dependent Costs)")
     print("="*70)
     
-    cpp_lc_count = 0
-    for i, instance_id in enumerate(instance_ids, 1):
-        try:
-            instance = gen.load_instance(instance_id)
-            
-            if instance.edge_demands is None:
-                continue
-            
+    # Only instances with demand data get a CPP-LC task
+    cpp_lc_ids = [iid for iid in instance_ids if instances[iid].edge_demands is not None]
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=quiet_worker) as ex:
+        futures = []
+        for instance_id in cpp_lc_ids:
+            instance = instances[instance_id]
             capacity = instance.vehicle_capacity if instance.vehicle_capacity else \
                       sum(instance.edge_demands.values()) / 2 * 0.4
-            
-            solver = SimplifiedCPPLC(instance.graph, instance.edge_demands, capacity)
-            
-            start = time.time()
-            cost, tour, meta = solver.solve_fast()
-            runtime = time.time() - start
-            
-            classical_cost = classical_costs.get(instance_id, cost)
-            gap = ((cost - classical_cost) / classical_cost * 100) if classical_cost > 0 else 0
-            
-            result = ExperimentResult(
-                instance_id=instance_id,
-                algorithm='cpp_lc_fast',
-                variant='cpp_lc_simplified',
-                cost=cost,
-                tour_length=len(tour) if tour else 0,
-                feasible=True,
-                runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
-                gap_from_classical=gap,
-                metadata=meta
-            )
-            
-            results.append(result)
-            cpp_lc_count += 1
-            
-        except Exception as e:
-            pass
-    
-    print(f"  ✅ {cpp_lc_count} CPP-LC results")
+            futures.append(ex.submit(_run_cpp_lc, instance.graph, instance.edge_demands, capacity))
+        
+        cpp_lc_done = []
+        for instance_id, future in zip(cpp_lc_ids, futures):
+            try:
+                cost, tour, meta, runtime = future.result()
+                cpp_lc_done.append((instance_id, cost, tour, meta, runtime))
+                
+            except Exception as e:
+                pass
+    
+    positions = [position[row[0]] for row in cpp_lc_done]
+    gaps = _gaps(np.array([row[1] for row in cpp_lc_done]), classical_arr[positions])
+    for (instance_id, cost, tour, meta, runtime), gap in zip(cpp_lc_done, gaps):
+        stream.add(instance_id=instance_id,
+                   algorithm='cpp_lc_fast',
+                   variant='cpp_lc_simplified',
+                   cost=cost,
+                   tour_length=len(tour) if tour else 0,
+                   feasible=True,
+                   runtime_seconds=runtime,
+                   **instance_meta[instance_id],
+                   gap_from_classical=gap,
+                   metadata=meta)
+    
+    print(f"  ✅ {len(cpp_lc_done)} CPP-LC results")
     
     # ==================== PART 5: LONDON ====================
     print("\n" + "="*70)
@@ -281,7 +366,8 @@ def main():
         
         if G_london:
             # Classical
-            cost, tour = solve_classical_cpp(G_london)
+            solution = solve_classical_cpp(G_london)
+            cost, tour = solution['cost'], solution['tour']
             london_classical = cost
             
             # Greedy
@@ -292,7 +378,7 @@ def main():
             
             # Save results
             for algo, c in [('classical_cpp', cost), ('greedy', cost_g), ('deep_rl', cost_rl)]:
-                results.append(ExperimentResult(
+                stream.add(**vars(ExperimentResult(
                     instance_id='london',
                     algorithm=algo,
                     variant='real_world',
@@ -305,7 +391,7 @@ def main():
                     network_family='osm_real',
                     size='real',
                     gap_from_classical=((c - london_classical) / london_classical * 100)
-                ))
+                )))
             
             print(f"  ✅ London: Classical={cost:.1f}, RL={cost_rl:.1f} ({((cost_rl-cost)/cost*100):.1f}% gap)")
             
@@ -317,13 +403,9 @@ def main():
     print("SAVING RESULTS")
     print("="*70)
     
-    df = pd.DataFrame([r.to_dict() for r in results])
-    
-    output_dir = Path("results_deep_rl")
-    output_dir.mkdir(exist_ok=True)
-    
-    df.to_csv(output_dir / "all_results.csv", index=False)
-    print(f"  ✓ CSV: {output_dir / 'all_results.csv'}")
+    stream.close()
+    df = pd.read_csv(results_file)
+    print(f"  ✓ CSV: {results_file}")
     
     summary = df.groupby('algorithm').agg({
         'cost': ['count', 'mean', 'std'],
@@ -346,7 +428,7 @@ def main():
     print("\n" + "="*70)
     print("✅ COMPLETE!")
     print("="*70)
-    print(f"Total results: {len(results)}")
+    print(f"Total results: {len(df)}")
     print(f"Total time: {total_time/60:.1f} minutes")
     
     print("\n🎯 What you have:")
@@ -5,10 +5,13 @@ Use entire PBF but take manageable piece
 
 from pathlib import Path
 import networkx as nx
+import numpy as np
 import json
 from datetime import datetime
 import random
 
+from osm_utils import bfs_sample, largest_component, scale_lengths
+
 def extract_small_london_subgraph():
     """
     Extract full London network, then sample small connected piece
@@ -77,20 +80,9 @@ def extract_small_london_subgraph():
         # Start from random node, do BFS to get connected subgraph
         start_node = random.choice(list(G_full.nodes()))
         
-        subgraph_nodes = set()
-        queue = [start_node]
-        
-        while len(subgraph_nodes) < target_nodes and queue:
-            current = queue.pop(0)
-            if current in subgraph_nodes:
-                continue
-            
-            subgraph_nodes.add(current)
-            
-            # Add neighbors
-            for neighbor in G_full.neighbors(current):
-                if neighbor not in subgraph_nodes and len(subgraph_nodes) < target_nodes:
-                    queue.append(neighbor)
+        # The first target_nodes discovered in BFS order are the sample (the
+        # walk runs over CSR arrays, compiled when numba is installed)
+        subgraph_nodes = bfs_sample(G_full, start_node, target_nodes)
         
         G_sub = G_full.subgraph(subgraph_nodes).copy()
         
@@ -103,24 +95,31 @@ def extract_small_london_subgraph():
         for old_node, new_node in node_mapping.items():
             G_final.add_node(new_node)
         
-        for u, v, data in G_sub.edges(data=True):
-            u_new = node_mapping[u]
-            v_new = node_mapping[v]
-            
-            length = data.get('length', 100.0)
-            if isinstance(length, (list, tuple)):
-                length = length[0] if length else 100.0
-            
-            weight = float(length) / 100.0
-            
-            if not G_final.has_edge(u_new, v_new):
-                G_final.add_edge(u_new, v_new, weight=weight, length=float(length))
-        
-        # Ensure connected
+        # Edges as parallel arrays (u, v, length); the first copy of each
+        # node pair wins (parallel edges from the multigraph are dropped)
+        edges = np.array([
+            (node_mapping[u], node_mapping[v],
+             float((length[0] if length else 100.0)
+                   if isinstance(length, (list, tuple)) else length))
+            for u, v, length in G_sub.edges(data='length', default=100.0)
+        ], dtype=np.float64).reshape(-1, 3)
+        
+        pairs = np.sort(edges[:, :2], axis=1).astype(np.int64)
+        _, first = np.unique(pairs, axis=0, return_index=True)
+        first.sort()  # Keep the original edge order
+        
+        u_arr = edges[first, 0].astype(np.int64).tolist()
+        v_arr = edges[first, 1].astype(np.int64).tolist()
+        lengths = edges[first, 2]
+        
+        weights = scale_lengths(lengths, 1.0 / 100.0, 100.0)
+        G_final.add_weighted_edges_from(zip(u_arr, v_arr, weights.tolist()))
+        G_final.add_weighted_edges_from(zip(u_arr, v_arr, lengths.tolist()), weight='length')
+        
+        # Ensure connected (keeping the largest component relabels it to
+        # 0..n-1 in the same copy, so no convert_node_labels_to_integers pass)
         if not nx.is_connected(G_final):
-            largest_cc = max(nx.connected_components(G_final), key=len)
-            G_final = G_final.subgraph(largest_cc).copy()
-            G_final = nx.convert_node_labels_to_integers(G_final)
+            G_final = largest_component(G_final)
         
         # Save
         output_dir = Path("benchmarks/osm_derived")
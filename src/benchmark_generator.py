@@ -434,14 +434,14 @@ class BenchmarkGenerator:
             if 'pos' in G_export.nodes[node]:
                 del G_export.nodes[node]['pos']
         
-        # Save graph as GraphML (human-readable)
+        # Save graph as GraphML (human-readable; lxml writer when installed)
         graphml_path = family_dir / f"{instance_id}.graphml"
-        nx.write_graphml(G_export, graphml_path)
+        nx.write_graphml(G_export, graphml_path, prettyprint=False)
         
         # Save complete instance as pickle (includes all data, including positions)
         pickle_path = family_dir / f"{instance_id}.pkl"
         with open(pickle_path, 'wb') as f:
-            pickle.dump(instance, f)
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
         
         # Save metadata as JSON (human-readable)
         json_path = family_dir / f"{instance_id}_metadata.json"
@@ -494,17 +494,31 @@ class BenchmarkGenerator:
         
         print("\n" + "".join(report))
     
-    def load_instance(self, instance_id: str) -> CPPInstance:
-        """Load a saved instance"""
+    def instance_path(self, instance_id: str) -> Path:
+        """Path of a saved instance's pickle"""
         # Search all family directories
         for family in NetworkFamily:
             pickle_path = self.output_dir / family.value / f"{instance_id}.pkl"
             if pickle_path.exists():
-                with open(pickle_path, 'rb') as f:
-                    return pickle.load(f)
+                return pickle_path
         
         raise FileNotFoundError(f"Instance {instance_id} not found")
     
+    def load_instance(self, instance_id: str) -> CPPInstance:
+        """Load a saved instance"""
+        with open(self.instance_path(instance_id), 'rb') as f:
+            return pickle.load(f)
+    
+    def load_metadata(self, instance_id: str) -> InstanceMetadata:
+        """Load only an instance's metadata (its JSON sidecar, no graph unpickling)"""
+        for family in NetworkFamily:
+            json_path = self.output_dir / family.value / f"{instance_id}_metadata.json"
+            if json_path.exists():
+                with open(json_path) as f:
+                    return InstanceMetadata(**json.load(f))
+        
+        raise FileNotFoundError(f"Metadata for {instance_id} not found")
+    
     def get_instance_list(self, family: Optional[NetworkFamily] = None, 
                          size: Optional[GraphSize] = None) -> List[str]:
         """Get list of instance IDs matching criteria"""
@@ -3,22 +3,38 @@ Adapter/Wrapper Functions for Experimental Pipeline
 Bridges the experimental pipeline with existing CPP solver implementations
 """
 
+import heapq
 import networkx as nx
 from typing import Tuple, List, Dict
 import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in: the CSR kernels run as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
 
 # Import existing implementations
 from cpp_solver import CPPSolver
 from cpp_load_dependent import CPPLoadDependentCosts, LoadCostFunction
 
 
-def solve_classical_cpp(G: nx.Graph, timeout_seconds: int = 600) -> Dict:
+def solve_classical_cpp(G: nx.Graph, timeout_seconds: int = 600, use_igraph: bool = None) -> Dict:
     """
     Solve classical CPP using FIXED solver with proper matching
     
     Args:
         G: NetworkX graph
         timeout_seconds: Maximum time allowed (default 10 minutes)
+        use_igraph: Force the igraph (True) or NetworkX (False) shortest paths;
+            None uses igraph whenever it is installed
         
     Returns:
         Dictionary with:
@@ -29,100 +45,230 @@ def solve_classical_cpp(G: nx.Graph, timeout_seconds: int = 600) -> Dict:
         - Other metadata fields
     """
     # Import the fixed solver
-    from cpp_solver_fixed import solve_classical_cpp_fixed
+    from cpp_solver_fixed import solve_classical_cpp_fixed, IGRAPH_AVAILABLE
     
-    result = solve_classical_cpp_fixed(G, timeout_seconds=timeout_seconds)
+    if use_igraph is None:
+        use_igraph = IGRAPH_AVAILABLE
+    result = solve_classical_cpp_fixed(G, timeout_seconds=timeout_seconds, use_igraph=use_igraph)
     return result
 
 
+@njit(cache=True, boundscheck=False)
+def _dijkstra(indptr, indices, weights, n, source):
+    """Single-source shortest paths on CSR arrays (distances + predecessors)"""
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    done = np.zeros(n, dtype=np.bool_)
+    dist[source] = 0.0
+    heap = [(0.0, int(source))]
+
+    while len(heap) > 0:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        for k in range(indptr[u], indptr[u + 1]):
+            v = int(indices[k])
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                heapq.heappush(heap, (nd, v))
+
+    return dist, pred
+
+
+@njit(cache=True, boundscheck=False)
+def _greedy_core(indptr, indices, weights, n, depot=0):
+    """
+    Greedy edge-covering walk on a CSR adjacency
+
+    Each undirected edge appears as two CSR slots (u->v and v->u); both are
+    marked visited together. Returns (cost, tour) with tour as node indices.
+    """
+    nnz = indices.shape[0]
+
+    # Twin slot of every directed entry, and number of undirected edges
+    twin = np.empty(nnz, dtype=np.int64)
+    remaining = 0
+    for u in range(n):
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            for t in range(indptr[v], indptr[v + 1]):
+                if indices[t] == u:
+                    twin[k] = t
+                    break
+            if u <= v:
+                remaining += 1
+
+    visited = np.zeros(nnz, dtype=np.bool_)
+    tour = [int(depot)]
+    current = int(depot)
+    total_cost = 0.0
+
+    while remaining > 0:
+        dist, pred = _dijkstra(indptr, indices, weights, n, current)
+
+        # Nearest unvisited edge: travel to its start, then traverse it
+        best_k = -1
+        best_u = -1
+        best_cost = np.inf
+        for u in range(n):
+            if dist[u] == np.inf:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                if visited[k]:
+                    continue
+                cost = dist[u] + weights[k]
+                if cost < best_cost:
+                    best_cost = cost
+                    best_k = k
+                    best_u = u
+
+        if best_k < 0:
+            break  # No more reachable edges
+
+        # Walk current -> best_u along the shortest path tree
+        path = []
+        node = best_u
+        while node != current:
+            path.append(node)
+            node = pred[node]
+        for i in range(len(path) - 1, -1, -1):
+            tour.append(path[i])
+
+        v = int(indices[best_k])
+        tour.append(v)
+        total_cost += best_cost
+        current = v
+
+        visited[best_k] = True
+        visited[twin[best_k]] = True
+        remaining -= 1
+
+    # Return to depot
+    if current != depot:
+        dist, pred = _dijkstra(indptr, indices, weights, n, current)
+        if dist[depot] < np.inf:
+            path = []
+            node = int(depot)
+            while node != current:
+                path.append(node)
+                node = pred[node]
+            for i in range(len(path) - 1, -1, -1):
+                tour.append(path[i])
+            total_cost += dist[depot]
+
+    out = np.empty(len(tour), dtype=np.int32)
+    for i in range(len(tour)):
+        out[i] = tour[i]
+    return total_cost, out
+
+
 def solve_greedy_heuristic(G: nx.Graph) -> Tuple[float, List]:
     """
     Simple greedy heuristic for CPP
 
+    Repeatedly travels to the nearest unvisited edge (one Dijkstra per step)
+    and traverses it, then returns to the depot (node 0).
+
     Args:
         G: NetworkX graph
 
     Returns:
         (cost, tour) tuple
     """
-    # Greedy: pick nearest unvisited edge at each step
-    tour = [0]  # Start at depot
-    current_node = 0
-    visited_edges = set()
-    total_cost = 0
-
-    # Track all edges (both directions)
-    all_edges = set()
-    for u, v in G.edges():
-        all_edges.add((u, v))
-        all_edges.add((v, u))
-
-    # While there are unvisited edges
-    while len(visited_edges) < len(all_edges):
-        # Find nearest unvisited edge from current position
-        best_edge = None
-        best_cost = float('inf')
-        best_path = None
-
-        for u, v in all_edges:
-            if (u, v) in visited_edges or (v, u) in visited_edges:
-                continue
+    nodelist = list(G.nodes())
+    A = nx.to_scipy_sparse_array(G, nodelist=nodelist, weight='weight', format='csr')
+    depot = nodelist.index(0) if 0 in G else 0
 
-            # Cost to reach this edge from current position
-            try:
-                if current_node == u:
-                    # Already at edge start
-                    cost = G[u][v].get('weight', 1.0)
-                    path = [u, v]
-                elif current_node == v:
-                    # At edge end, traverse backwards
-                    cost = G[v][u].get('weight', 1.0) if G.has_edge(v, u) else G[u][v].get('weight', 1.0)
-                    path = [v, u]
-                else:
-                    # Need to travel to edge
-                    travel = nx.shortest_path_length(G, current_node, u, weight='weight')
-                    edge_cost = G[u][v].get('weight', 1.0)
-                    cost = travel + edge_cost
-                    path = nx.shortest_path(G, current_node, u, weight='weight') + [v]
+    cost, tour = _greedy_core(
+        A.indptr.astype(np.int32),
+        A.indices.astype(np.int32),
+        A.data.astype(np.float64),
+        np.int32(len(nodelist)),
+        np.int32(depot),
+    )
 
-                if cost < best_cost:
-                    best_cost = cost
-                    best_edge = (u, v)
-                    best_path = path
-            except nx.NetworkXNoPath:
-                continue
+    return float(cost), [nodelist[i] for i in tour]
 
-        if best_edge is None:
-            break  # No more reachable edges
 
-        # Add path to tour and cost
-        if best_path:
-            # Add travel cost
-            for i in range(len(best_path) - 1):
-                u, v = best_path[i], best_path[i+1]
-                if G.has_edge(u, v):
-                    total_cost += G[u][v].get('weight', 1.0)
-                elif G.has_edge(v, u):
-                    total_cost += G[v][u].get('weight', 1.0)
+def tour_cost_matrix(G: nx.Graph, nodelist: List) -> np.ndarray:
+    """
+    Cost of every step u -> v of a node tour, as a dense (n, n) matrix
+
+    The direct edge weight when u and v are adjacent, otherwise the shortest
+    path length (scipy, all sources at once); 1000 when v is unreachable.
+    """
+    A = nx.to_scipy_sparse_array(G, nodelist=nodelist, weight='weight', format='csr')
+    C = shortest_path(A, method='D', directed=False)
+    C[np.isinf(C)] = 1000
+    rows, cols = A.nonzero()
+    C[rows, cols] = A[rows, cols]
+    return C
 
-            tour.extend(best_path[1:])  # Don't duplicate current node
-            current_node = best_path[-1]
 
-        # Mark edge as visited (both directions)
-        visited_edges.add(best_edge)
-        visited_edges.add((best_edge[1], best_edge[0]))
+@njit(cache=True, boundscheck=False)
+def _tour_cost(C, tour, i, j):
+    """Cost of tour with segment [i..j] reversed (j < i: as is), summed step by step"""
+    cost = 0.0
+    prev = tour[0]
+    for p in range(1, tour.shape[0]):
+        node = tour[i + j - p] if i <= p <= j else tour[p]
+        cost += C[prev, node]
+        prev = node
+    return cost
 
-    # Return to depot
-    if current_node != 0:
-        try:
-            path = nx.shortest_path(G, current_node, 0, weight='weight')
-            tour.extend(path[1:])
-            for i in range(len(path) - 1):
-                total_cost += G[path[i]][path[i+1]].get('weight', 1.0)
-        except:
-            pass
 
-    return total_cost, tour
+@njit(cache=True, boundscheck=False)
+def _two_opt_core(C, tour, max_iterations):
+    """
+    First-improvement 2-opt on an index tour, in place
+
+    Reversing tour[i..j] only changes the steps into and out of the segment,
+    so each candidate is an O(1) delta on the cost matrix; the first
+    improving (i, j) in scan order is taken and the scan restarts.
+    Near-zero deltas (ties through zero-cost u -> u steps are common) are
+    settled by re-summing the whole tour, as the full-recompute version did.
+    """
+    n = tour.shape[0]
+    best_cost = _tour_cost(C, tour, 0, -1)
+    improved = True
+    iteration = 0
+
+    while improved and iteration < max_iterations:
+        improved = False
+        iteration += 1
+        tol = 1e-9 * (1.0 + abs(best_cost))
+
+        for i in range(1, n - 2):
+            a = tour[i - 1]
+            b = tour[i]
+            for j in range(i + 1, n - 1):
+                c = tour[j]
+                d = tour[j + 1]
+                delta = C[a, c] + C[b, d] - C[a, b] - C[c, d]
+                if delta > tol:
+                    continue
+                if delta >= -tol and not _tour_cost(C, tour, i, j) < best_cost:
+                    continue
+
+                # Reverse segment [i:j+1]
+                lo, hi = i, j
+                while lo < hi:
+                    tmp = tour[lo]
+                    tour[lo] = tour[hi]
+                    tour[hi] = tmp
+                    lo += 1
+                    hi -= 1
+                best_cost = _tour_cost(C, tour, 0, -1)
+                improved = True
+                break
+
+            if improved:
+                break
+
+    return tour, best_cost
 
 
 def solve_two_opt(G: nx.Graph, initial_tour: List = None, max_iterations: int = 100) -> Tuple[float, List]:
@@ -144,46 +290,18 @@ def solve_two_opt(G: nx.Graph, initial_tour: List = None, max_iterations: int =
     if not initial_tour or len(initial_tour) < 4:
         return solve_greedy_heuristic(G)
     
-    def tour_cost(tour, G):
-        """Compute total tour cost"""
-        cost = 0
-        for i in range(len(tour) - 1):
-            u, v = tour[i], tour[i + 1]
-            if G.has_edge(u, v):
-                cost += G[u][v].get('weight', 1.0)
-            else:
-                try:
-                    cost += nx.shortest_path_length(G, u, v, weight='weight')
-                except:
-                    cost += 1000
-        return cost
-    
-    best_tour = initial_tour.copy()
-    best_cost = tour_cost(best_tour, G)
+    # Work on node indices against a precomputed step-cost matrix
+    nodelist = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodelist)}
+    C = tour_cost_matrix(G, nodelist)
     
-    improved = True
-    iteration = 0
+    tour = np.fromiter((index[node] for node in initial_tour),
+                       dtype=np.int64, count=len(initial_tour))
+    tour, best_cost = _two_opt_core(C, tour, max_iterations)
     
-    while improved and iteration < max_iterations:
-        improved = False
-        iteration += 1
-        
-        for i in range(1, len(best_tour) - 2):
-            for j in range(i + 1, len(best_tour) - 1):
-                # Try reversing segment [i:j+1]
-                new_tour = best_tour[:i] + best_tour[i:j+1][::-1] + best_tour[j+1:]
-                new_cost = tour_cost(new_tour, G)
-                
-                if new_cost < best_cost:
-                    best_tour = new_tour
-                    best_cost = new_cost
-                    improved = True
-                    break
-            
-            if improved:
-                break
+    best_tour = [nodelist[i] for i in tour.tolist()]
     
-    return best_cost, best_tour
+    return float(best_cost), best_tour
 
 
 def solve_cpp_lc_greedy(G: nx.Graph, edge_demands: Dict, capacity: float, 
@@ -15,6 +15,12 @@ from typing import List, Tuple, Dict, Optional
 import time
 import threading
 
+try:
+    import igraph as ig
+    IGRAPH_AVAILABLE = True
+except ImportError:
+    IGRAPH_AVAILABLE = False
+
 
 class TimeoutException(Exception):
     """Raised when operation times out"""
@@ -50,13 +56,72 @@ def time_limit(seconds):
     return TimeoutContext(seconds)
 
 
-def solve_classical_cpp_fixed(G: nx.Graph, timeout_seconds: int = 600) -> Dict:
+def nx_to_igraph(G: nx.Graph):
+    """
+    Copy G into an undirected igraph.Graph (C-backed adjacency) once per solve
+
+    Returns:
+        (ig_G, index) where index maps NetworkX node -> igraph vertex id
+    """
+    index = {node: i for i, node in enumerate(G.nodes())}
+    edges = [(index[u], index[v]) for u, v in G.edges()]
+    weights = [w for _, _, w in G.edges(data='weight')]
+    ig_G = ig.Graph(n=len(index), edges=edges, edge_attrs={'weight': weights}, directed=False)
+    return ig_G, index
+
+
+def odd_vertex_distances(G: nx.Graph, odd_vertices: List, ig_graph=None) -> np.ndarray:
+    """
+    Shortest-path distances between every pair of odd vertices
+
+    Uses igraph's C Dijkstra when an (ig_G, index) pair from nx_to_igraph is
+    given, otherwise one NetworkX single-source Dijkstra per odd vertex.
+
+    Returns:
+        (k, k) array where entry [i, j] is the distance odd_vertices[i] -> odd_vertices[j]
+    """
+    if ig_graph is not None:
+        ig_G, index = ig_graph
+        odd_idx = [index[v] for v in odd_vertices]
+        return np.asarray(ig_G.distances(source=odd_idx, target=odd_idx, weights='weight'), dtype=float)
+
+    dist = np.empty((len(odd_vertices), len(odd_vertices)))
+    for i, u in enumerate(odd_vertices):
+        lengths = nx.single_source_dijkstra_path_length(G, u, weight='weight')
+        for j, v in enumerate(odd_vertices):
+            dist[i, j] = lengths.get(v, np.inf)
+    return dist
+
+
+def matching_paths(G: nx.Graph, matching, ig_graph=None) -> List[List]:
+    """
+    Shortest path (as a node list) for every matched (u, v) pair
+
+    With an igraph copy the paths are read in C (one Dijkstra per pair);
+    otherwise NetworkX's shortest_path is used.
+    """
+    if ig_graph is None:
+        return [nx.shortest_path(G, u, v, weight='weight') for u, v in matching]
+
+    ig_G, index = ig_graph
+    nodes = list(index)
+    paths = []
+    for u, v in matching:
+        vpath = ig_G.get_shortest_paths(index[u], to=index[v], weights='weight', output='vpath')[0]
+        paths.append([nodes[i] for i in vpath])
+    return paths
+
+
+def solve_classical_cpp_fixed(G: nx.Graph, timeout_seconds: int = 600,
+                              use_igraph: bool = IGRAPH_AVAILABLE) -> Dict:
     """
     Solve classical CPP with proper minimum-weight matching
     
     Args:
         G: NetworkX graph with 'weight' edge attribute
         timeout_seconds: Maximum time allowed (default 10 minutes)
+        use_igraph: Run the shortest-path queries on an igraph copy of G
+            (default: whenever python-igraph is installed; False for A/B runs)
         
     Returns:
         Dictionary with:
@@ -111,16 +176,19 @@ def solve_classical_cpp_fixed(G: nx.Graph, timeout_seconds: int = 600) -> Dict:
             
             print(f"  Computing shortest paths between {len(odd_vertices)} odd vertices...")
             
+            # One igraph copy serves both the distance matrix and the matched paths
+            ig_graph = nx_to_igraph(G) if use_igraph and IGRAPH_AVAILABLE else None
+            dist = odd_vertex_distances(G, odd_vertices, ig_graph)
+
             for i, u in enumerate(odd_vertices):
                 for j, v in enumerate(odd_vertices):
                     if i < j:
-                        try:
-                            sp_length = nx.shortest_path_length(G, u, v, weight='weight')
-                            # Use NEGATIVE weights for max_weight_matching
-                            # (we want minimum weight, but NetworkX only has max_weight_matching)
-                            K.add_edge(u, v, weight=-sp_length, original_weight=sp_length)
-                        except nx.NetworkXNoPath:
+                        sp_length = dist[i, j]
+                        if not np.isfinite(sp_length):
                             raise ValueError(f"No path between odd vertices {u} and {v}")
+                        # Use NEGATIVE weights for max_weight_matching
+                        # (we want minimum weight, but NetworkX only has max_weight_matching)
+                        K.add_edge(u, v, weight=-sp_length, original_weight=sp_length)
             
             print(f"  Finding minimum-weight perfect matching...")
             
@@ -145,11 +213,11 @@ def solve_classical_cpp_fixed(G: nx.Graph, timeout_seconds: int = 600) -> Dict:
             matching_cost = 0
             augmentation_edges = []
             
-            for u, v in matching:
-                # Get the actual shortest path
-                sp = nx.shortest_path(G, u, v, weight='weight')
-                sp_cost = nx.shortest_path_length(G, u, v, weight='weight')
-                matching_cost += sp_cost
+            odd_index = {v: i for i, v in enumerate(odd_vertices)}
+            
+            for (u, v), sp in zip(matching, matching_paths(G, matching, ig_graph)):
+                # Path length is already in the odd-vertex distance matrix
+                matching_cost += float(dist[odd_index[u], odd_index[v]])
                 
                 # Store edges to augment
                 for i in range(len(sp) - 1):
@@ -140,10 +140,12 @@ class ExperimentalPipeline:
         for instance_id in tqdm(instance_ids, desc="Classical CPP"):
             try:
                 instance = self.benchmark_gen.load_instance(instance_id)
+                G, m = instance.graph, instance.metadata
                 
                 start_time = time.time()
-                cost, tour = solve_classical_cpp(instance.graph)
+                solution = solve_classical_cpp(G)
                 runtime = time.time() - start_time
+                cost, tour = solution['cost'], solution['tour']
                 
                 # Cache for gap computation
                 self.classical_costs[instance_id] = cost
@@ -156,10 +158,10 @@ class ExperimentalPipeline:
                     tour_length=len(tour) if tour else 0,
                     feasible=True,
                     runtime_seconds=runtime,
-                    num_nodes=instance.metadata.num_nodes,
-                    num_edges=instance.metadata.num_edges,
-                    network_family=instance.metadata.network_family,
-                    size=instance.metadata.size,
+                    num_nodes=m.num_nodes,
+                    num_edges=m.num_edges,
+                    network_family=m.network_family,
+                    size=m.size,
                     gap_from_classical=0.0  # Baseline
                 )
                 
@@ -195,6 +197,7 @@ class ExperimentalPipeline:
         for instance_id in tqdm(instance_ids[:50], desc="CPP-LC"):  # Limit for speed
             try:
                 instance = self.benchmark_gen.load_instance(instance_id)
+                G, m = instance.graph, instance.metadata
                 
                 if instance.edge_demands is None:
                     continue
@@ -209,7 +212,7 @@ class ExperimentalPipeline:
                         try:
                             start_time = time.time()
                             cost, tour, meta = solve_cpp_lc_greedy(
-                                instance.graph,
+                                G,
                                 instance.edge_demands,
                                 capacity,
                                 cost_func.value
@@ -228,10 +231,10 @@ class ExperimentalPipeline:
                                 tour_length=len(tour) if tour else 0,
                                 feasible=True,
                                 runtime_seconds=runtime,
-                                num_nodes=instance.metadata.num_nodes,
-                                num_edges=instance.metadata.num_edges,
-                                network_family=instance.metadata.network_family,
-                                size=instance.metadata.size,
+                                num_nodes=m.num_nodes,
+                                num_edges=m.num_edges,
+                                network_family=m.network_family,
+                                size=m.size,
                                 gap_from_classical=gap,
                                 metadata={
                                     'cost_function': cost_func.value,
@@ -300,22 +303,24 @@ class ExperimentalPipeline:
         try:
             from cpp_adapters import solve_greedy_heuristic
             
+            G, m = instance.graph, instance.metadata
+            
             start_time = time.time()
-            cost, tour = solve_greedy_heuristic(instance.graph)
+            cost, tour = solve_greedy_heuristic(G)
             runtime = time.time() - start_time
             
             return ExperimentResult(
-                instance_id=instance.metadata.instance_id,
+                instance_id=m.instance_id,
                 algorithm='greedy_heuristic',
                 variant='greedy',
                 cost=cost,
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size
             )
         except Exception as e:
             return None
@@ -325,22 +330,24 @@ class ExperimentalPipeline:
         try:
             from ortools_baseline import solve_with_ortools
             
+            G, m = instance.graph, instance.metadata
+            
             start_time = time.time()
-            cost, tour = solve_with_ortools(instance.graph)
+            cost, tour = solve_with_ortools(G)
             runtime = time.time() - start_time
             
             return ExperimentResult(
-                instance_id=instance.metadata.instance_id,
+                instance_id=m.instance_id,
                 algorithm='ortools',
                 variant='ortools_cvrp',
                 cost=cost,
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size
             )
         except Exception as e:
             return None
@@ -350,22 +357,24 @@ class ExperimentalPipeline:
         try:
             from cpp_adapters import solve_two_opt
             
+            G, m = instance.graph, instance.metadata
+            
             start_time = time.time()
-            cost, tour = solve_two_opt(instance.graph)
+            cost, tour = solve_two_opt(G)
             runtime = time.time() - start_time
             
             return ExperimentResult(
-                instance_id=instance.metadata.instance_id,
+                instance_id=m.instance_id,
                 algorithm='two_opt',
                 variant='local_search',
                 cost=cost,
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size
             )
         except Exception as e:
             return None
@@ -377,22 +386,24 @@ class ExperimentalPipeline:
             
             solver = HybridCPPSolver()
             
+            G, m = instance.graph, instance.metadata
+            
             start_time = time.time()
-            cost, tour, meta = solver.solve(instance.graph)
+            cost, tour, meta = solver.solve(G)
             runtime = time.time() - start_time
             
             return ExperimentResult(
-                instance_id=instance.metadata.instance_id,
+                instance_id=m.instance_id,
                 algorithm='hybrid_learning',
                 variant='gnn_hybrid',
                 cost=cost,
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size,
                 metadata=meta
             )
         except Exception as e:
@@ -27,6 +27,7 @@ class ImprovedMLCPP:
             n_estimators=50,
             max_depth=10,
             min_samples_split=5,
+            n_jobs=-1,  # Fit trees (and predict) on all cores
             random_state=42
         )
         self.scaler = StandardScaler()
@@ -14,6 +14,21 @@ import numpy as np
 from typing import List, Tuple, Dict
 from sklearn.linear_model import LinearRegression
 import pickle
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import dijkstra
+
+
+def graph_csr(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (indptr, indices, weight) CSR arrays of an integer-labelled (0..n-1) graph
+
+    Built once per graph and passed to SimpleMLCPP via `csr=` so degrees,
+    edge weights and shortest paths are read from flat arrays.
+    """
+    A = nx.to_scipy_sparse_array(G, nodelist=range(G.number_of_nodes()),
+                                 weight='weight', format='csr')
+    A.sort_indices()
+    return A.indptr, A.indices, A.data.astype(np.float64)
 
 
 class SimpleMLCPP:
@@ -53,41 +68,75 @@ class SimpleMLCPP:
         ]
         
         return np.array(features)
+
+    def edge_feature_matrix(self, G: nx.Graph, edges: List[Tuple], csr=None) -> np.ndarray:
+        """
+        Features for many edges at once (same columns as extract_edge_features)
+
+        Degrees and edge weights are gathered into flat arrays in one pass
+        over the graph, then every column is filled with array indexing.
+        With csr=(indptr, indices, weight) from graph_csr they are read from
+        the CSR arrays instead (degree = indptr[n+1] - indptr[n]).
+        """
+        if not edges:
+            return np.empty((0, 5))
+
+        m = len(edges)
+        ends = np.asarray(edges)
+
+        if csr is not None:
+            indptr, indices, data = csr
+            n = len(indptr) - 1
+            degree = np.diff(indptr).astype(np.float64)
+            ui, vi = ends[:, 0], ends[:, 1]
+            weight = csr_array((data, indices, indptr), shape=(n, n))[ui, vi]
+        else:
+            index = {n: i for i, n in enumerate(G)}
+            degree = np.fromiter((d for _, d in G.degree()), dtype=np.float64, count=len(index))
+            ui = np.fromiter((index[u] for u, _ in edges), dtype=np.int64, count=m)
+            vi = np.fromiter((index[v] for _, v in edges), dtype=np.int64, count=m)
+            weight = np.fromiter((G[u][v].get('weight', 1.0) for u, v in edges), dtype=np.float64, count=m)
+
+        du, dv = degree[ui], degree[vi]
+        return np.column_stack([weight, du, dv, (du + dv) / 2, ends.min(axis=1)])
     
-    def train_from_solutions(self, training_data: List[Tuple[nx.Graph, List]]):
+    def train_from_solutions(self, training_data: List[Tuple[nx.Graph, List]], csr: List = None):
         """
         Train from classical CPP solutions
 
         Args:
             training_data: List of (graph, tour) pairs
+            csr: Optional list of graph_csr arrays, one per training pair
         """
 
         X_train = []
         y_train = []
 
-        for G, tour in training_data:
+        for k, (G, tour) in enumerate(training_data):
+            G_csr = csr[k] if csr is not None else None
+
             # Handle empty tours (approximation mode)
             if not tour or len(tour) < 2:
                 # Fallback: use all edges with equal priority
-                for edge in G.edges():
-                    features = self.extract_edge_features(G, edge)
-                    priority = 1.0  # Equal priority
-                    X_train.append(features)
-                    y_train.append(priority)
+                edges = list(G.edges())
+                X_train.append(self.edge_feature_matrix(G, edges, G_csr))
+                y_train.append(np.ones(len(edges)))  # Equal priority
                 continue
 
             # Extract edge traversal order from tour
+            edges, priorities = [], []
             for i, (u, v) in enumerate(zip(tour[:-1], tour[1:])):
                 if G.has_edge(u, v):
-                    features = self.extract_edge_features(G, (u, v))
-                    priority = len(tour) - i  # Earlier = higher priority
+                    edges.append((u, v))
+                    priorities.append(len(tour) - i)  # Earlier = higher priority
 
-                    X_train.append(features)
-                    y_train.append(priority)
+            X_train.append(self.edge_feature_matrix(G, edges, G_csr))
+            y_train.append(np.array(priorities, dtype=np.float64))
+
+        X_train = np.vstack(X_train) if X_train else np.empty((0, 5))
+        y_train = np.concatenate(y_train) if y_train else np.empty(0)
 
         if len(X_train) >= 5:  # Need minimum data
-            X_train = np.array(X_train)
-            y_train = np.array(y_train)
 
             self.model.fit(X_train, y_train)
             self.trained = True
@@ -96,10 +145,15 @@ class SimpleMLCPP:
 
         return False
     
-    def solve_with_learning(self, G: nx.Graph) -> Tuple[float, List, Dict]:
+    def solve_with_learning(self, G: nx.Graph, csr=None) -> Tuple[float, List, Dict]:
         """
         Solve CPP using learned edge priorities
         
+        Args:
+            G: Integer-labelled graph (depot = node 0)
+            csr: Optional graph_csr(G) arrays; features and shortest paths are
+                then computed on them (scipy Dijkstra) instead of NetworkX
+        
         Returns:
             (cost, tour, metadata)
         """
@@ -112,9 +166,18 @@ class SimpleMLCPP:
         edges = list(G.edges())
         
         # Predict priorities
-        features = np.array([self.extract_edge_features(G, e) for e in edges])
+        features = self.edge_feature_matrix(G, edges, csr)
         priorities = self.model.predict(features)
         
+        if csr is not None:
+            shortest_path, edge_weight = self._csr_paths(csr)
+        else:
+            def shortest_path(source, target):
+                return nx.shortest_path(G, source, target, weight='weight')
+            
+            def edge_weight(a, b):
+                return G[a][b].get('weight', 1.0) if G.has_edge(a, b) else 0.0
+        
         # Sort by priority
         sorted_edges = [e for _, e in sorted(zip(priorities, edges), reverse=True)]
         
@@ -140,12 +203,12 @@ class SimpleMLCPP:
             else:
                 # Find path to edge
                 try:
-                    path_to_u = nx.shortest_path(G, current, u, weight='weight')
+                    path_to_u = shortest_path(current, u)
                     path = path_to_u + [v]
                     next_node = v
                 except:
                     try:
-                        path_to_v = nx.shortest_path(G, current, v, weight='weight')
+                        path_to_v = shortest_path(current, v)
                         path = path_to_v + [u]
                         next_node = u
                     except:
@@ -153,8 +216,7 @@ class SimpleMLCPP:
             
             # Add to tour
             for i in range(len(path) - 1):
-                if G.has_edge(path[i], path[i+1]):
-                    total_cost += G[path[i]][path[i+1]].get('weight', 1.0)
+                total_cost += edge_weight(path[i], path[i+1])
             
             tour.extend(path[1:])
             current = next_node
@@ -164,11 +226,10 @@ class SimpleMLCPP:
         # Return to depot
         if current != 0:
             try:
-                path_home = nx.shortest_path(G, current, 0, weight='weight')
+                path_home = shortest_path(current, 0)
                 tour.extend(path_home[1:])
                 for i in range(len(path_home) - 1):
-                    if G.has_edge(path_home[i], path_home[i+1]):
-                        total_cost += G[path_home[i]][path_home[i+1]].get('weight', 1.0)
+                    total_cost += edge_weight(path_home[i], path_home[i+1])
             except:
                 pass
         
@@ -185,6 +246,39 @@ class SimpleMLCPP:
         
         return total_cost, tour, metadata
     
+    @staticmethod
+    def _csr_paths(csr):
+        """
+        (shortest_path, edge_weight) lookups backed by CSR arrays
+
+        Each source gets one scipy (C) Dijkstra whose predecessor row is kept,
+        so repeated walks from the same node reuse it. shortest_path raises
+        nx.NetworkXNoPath for unreachable targets, like nx.shortest_path.
+        """
+        indptr, indices, data = csr
+        n = len(indptr) - 1
+        A = csr_array((data, indices, indptr), shape=(n, n))
+        pred_rows = {}
+        
+        def shortest_path(source, target):
+            pred = pred_rows.get(source)
+            if pred is None:
+                _, pred = dijkstra(A, indices=source, return_predecessors=True)
+                pred_rows[source] = pred
+            if target != source and pred[target] < 0:
+                raise nx.NetworkXNoPath(f"No path between {source} and {target}")
+            path = [target]
+            while path[-1] != source:
+                path.append(int(pred[path[-1]]))
+            return path[::-1]
+        
+        def edge_weight(a, b):
+            lo, hi = indptr[a], indptr[a + 1]
+            k = lo + np.searchsorted(indices[lo:hi], b)
+            return float(data[k]) if k < hi and indices[k] == b else 0.0
+        
+        return shortest_path, edge_weight
+    
     def _greedy_solve(self, G: nx.Graph) -> Tuple[float, List, Dict]:
         """Fallback greedy solver"""
         tour = [0]
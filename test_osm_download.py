@@ -88,6 +88,7 @@ def download_osm_by_coordinates():
     try:
         import osmnx as ox
         import networkx as nx
+        from osm_utils import osm_to_simple_graph
         
         # City coordinates (bbox: north, south, east, west)
         cities = {
@@ -128,27 +129,9 @@ def download_osm_by_coordinates():
                     simplify=True
                 )
                 
-                # Convert to simple undirected graph
-                G_simple = G.to_undirected()
-                G_final = nx.Graph()
-                
-                node_mapping = {node: i for i, node in enumerate(G_simple.nodes())}
-                G_final.add_nodes_from(range(len(node_mapping)))
-                
-                for u, v, data in G_simple.edges(data=True):
-                    u_idx = node_mapping[u]
-                    v_idx = node_mapping[v]
-                    length = data.get('length', 100.0)
-                    weight = length / 100.0
-                    
-                    if not G_final.has_edge(u_idx, v_idx):
-                        G_final.add_edge(u_idx, v_idx, weight=weight, length=length)
-                
-                # Take largest connected component
-                if not nx.is_connected(G_final):
-                    largest_cc = max(nx.connected_components(G_final), key=len)
-                    G_final = G_final.subgraph(largest_cc).copy()
-                    G_final = nx.convert_node_labels_to_integers(G_final)
+                # Collapse to a simple integer-labelled graph (duplicates dropped up front,
+                # largest component only)
+                G_final = osm_to_simple_graph(G)
                 
                 downloaded_networks[city_key] = G_final
                 
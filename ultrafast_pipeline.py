@@ -39,10 +39,12 @@ def run_ultra_fast():
     for i, instance_id in enumerate(instance_ids, 1):
         try:
             instance = gen.load_instance(instance_id)
+            G, m = instance.graph, instance.metadata
             
             start = time.time()
-            cost, tour = solve_classical_cpp(instance.graph)
+            solution = solve_classical_cpp(G)
             runtime = time.time() - start
+            cost, tour = solution['cost'], solution['tour']
             
             result = ExperimentResult(
                 instance_id=instance_id,
@@ -52,10 +54,10 @@ def run_ultra_fast():
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size,
                 gap_from_classical=0.0
             )
             
@@ -80,9 +82,10 @@ def run_ultra_fast():
     for i, instance_id in enumerate(instance_ids, 1):
         try:
             instance = gen.load_instance(instance_id)
+            G, m = instance.graph, instance.metadata
             
             start = time.time()
-            cost, tour = solve_greedy_heuristic(instance.graph)
+            cost, tour = solve_greedy_heuristic(G)
             runtime = time.time() - start
             
             classical_cost = classical_costs.get(instance_id, cost)
@@ -96,10 +99,10 @@ def run_ultra_fast():
                 tour_length=len(tour) if tour else 0,
                 feasible=True,
                 runtime_seconds=runtime,
-                num_nodes=instance.metadata.num_nodes,
-                num_edges=instance.metadata.num_edges,
-                network_family=instance.metadata.network_family,
-                size=instance.metadata.size,
+                num_nodes=m.num_nodes,
+                num_edges=m.num_edges,
+                network_family=m.network_family,
+                size=m.size,
                 gap_from_classical=gap
             )
             